@@ -0,0 +1,71 @@
+"""Нагрузочный тест API фильмов.
+
+Запуск против локального сервера:
+    python benchmarks/api_load_test.py --url http://127.0.0.1:8000/api/v1/movies/ \
+        --concurrency 16 --requests 2000
+"""
+import argparse
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fetch(url, etag=None):
+    request = urllib.request.Request(url)
+    if etag:
+        request.add_header('If-None-Match', etag)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    return status, time.perf_counter() - started
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run(url, concurrency, total, etag=None):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: fetch(url, etag), range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency * 1000 for _, latency in results]
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print(f'url:          {url}')
+    print(f'conditional:  {bool(etag)}')
+    print(f'statuses:     {statuses}')
+    print(f'requests/sec: {total / elapsed:.1f}')
+    print(f'p50, ms:      {statistics.median(latencies):.2f}')
+    print(f'p99, ms:      {percentile(latencies, 99):.2f}')
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000/api/v1/movies/')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    run(args.url, args.concurrency, args.requests)
+
+    # Повторный прогон с If-None-Match показывает стоимость ответа 304
+    with urllib.request.urlopen(args.url) as response:
+        etag = response.headers.get('ETag')
+    if etag:
+        run(args.url, args.concurrency, args.requests, etag=etag)
+
+
+if __name__ == '__main__':
+    main()
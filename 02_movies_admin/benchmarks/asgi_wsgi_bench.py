@@ -0,0 +1,180 @@
+"""Пакетный поиск фильмов под ASGI (uvicorn) и WSGI (gunicorn).
+
+Скрипт сам запускает оба сервера на config.asgi и config.wsgi, набирает идентификаторы
+фильмов через /api/v1/movies/ и нагружает /api/v1/movies/batch/ с растущим числом
+одновременных запросов. Для каждого уровня выводятся запросы/с, p50/p99 и прирост
+памяти процессов сервера (RSS по /proc, только Linux) в пересчёте на один запрос в работе.
+
+Через ASGI стоит отдавать только эндпоинты /api/v1/*/batch/: админка с потоковыми
+выгрузками остаётся на WSGI, см. config/asgi.py.
+
+Серверы в зависимости проекта не входят, их нужно поставить отдельно:
+    pip install uvicorn gunicorn
+    python benchmarks/asgi_wsgi_bench.py --concurrency 1,16,64,256 --batch-size 100
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def server_command(kind, port, workers, threads):
+    if kind == 'asgi':
+        return [sys.executable, '-m', 'uvicorn', 'config.asgi:application',
+                '--port', str(port), '--workers', str(workers), '--log-level', 'warning']
+    return [sys.executable, '-m', 'gunicorn', 'config.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+            '--threads', str(threads), '--log-level', 'warning']
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url) as response:
+                response.read()
+                return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f'server at {url} did not start')
+
+
+def process_tree(pid):
+    pids = [pid]
+    for parent in pids:
+        try:
+            tasks = os.listdir(f'/proc/{parent}/task')
+        except FileNotFoundError:
+            continue
+        for task in tasks:
+            with open(f'/proc/{parent}/task/{task}/children') as file:
+                pids.extend(int(child) for child in file.read().split())
+    return pids
+
+
+def rss_mb(pid):
+    total = 0
+    for child in process_tree(pid):
+        try:
+            with open(f'/proc/{child}/status') as file:
+                for line in file:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+        except FileNotFoundError:
+            continue
+    return total / 1024
+
+
+class MemorySampler(threading.Thread):
+    """Максимальный RSS дерева процессов сервера за время нагрузки."""
+
+    def __init__(self, pid):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.peak = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(0.05):
+            self.peak = max(self.peak, rss_mb(self.pid))
+
+
+def collect_ids(base_url, count):
+    ids, cursor = [], None
+    while len(ids) < count:
+        url = f'{base_url}/api/v1/movies/?page_size=100' + (f'&cursor={cursor}' if cursor else '')
+        with urllib.request.urlopen(url) as response:
+            page = json.load(response)
+        ids.extend(film['id'] for film in page['results'])
+        cursor = page['next']
+        if not cursor:
+            break
+    return ids[:count]
+
+
+def post_batch(url, body):
+    request = urllib.request.Request(url, data=body, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    return status, time.perf_counter() - started
+
+
+def load(url, pid, bodies, concurrency):
+    idle = rss_mb(pid)
+    sampler = MemorySampler(pid)
+    sampler.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda body: post_batch(url, body), bodies))
+    elapsed = time.perf_counter() - started
+    sampler.stopped.set()
+    sampler.join()
+
+    latencies = sorted(latency * 1000 for _, latency in results)
+    errors = sum(status != 200 for status, _ in results)
+    return {
+        'rps': len(results) / elapsed,
+        'p50': statistics.median(latencies),
+        'p99': latencies[max(int(len(latencies) * 0.99) - 1, 0)],
+        'errors': errors,
+        'mb_per_request': max(sampler.peak - idle, 0) / concurrency,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--servers', default='asgi,wsgi')
+    parser.add_argument('--concurrency', default='1,16,64,256')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=16, help='потоков gunicorn на воркер')
+    parser.add_argument('--port', type=int, default=8100)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+    rows = []
+    for kind in args.servers.split(','):
+        base_url = f'http://127.0.0.1:{args.port}'
+        server = subprocess.Popen(server_command(kind, args.port, args.workers, args.threads),
+                                  cwd=PROJECT_DIR)
+        try:
+            wait_ready(f'{base_url}/api/v1/movies/?page_size=1')
+            ids = collect_ids(base_url, args.batch_size * 10)
+            bodies = [
+                json.dumps({'ids': [ids[(n + i) % len(ids)] for i in range(args.batch_size)]})
+                .encode()
+                for n in range(args.requests)
+            ]
+            for concurrency in levels:
+                result = load(f'{base_url}/api/v1/movies/batch/', server.pid, bodies, concurrency)
+                rows.append((kind, concurrency, result))
+                print(f'{kind} x{concurrency}: {result["rps"]:.1f} req/s', flush=True)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f'\n{"server":<8}{"conc":>6}{"req/s":>10}{"p50, ms":>10}{"p99, ms":>10}'
+          f'{"MB/req":>9}{"errors":>8}')
+    for kind, concurrency, r in rows:
+        print(f'{kind:<8}{concurrency:>6}{r["rps"]:>10.1f}{r["p50"]:>10.2f}{r["p99"]:>10.2f}'
+              f'{r["mb_per_request"]:>9.2f}{r["errors"]:>8}')
+
+
+if __name__ == '__main__':
+    main()
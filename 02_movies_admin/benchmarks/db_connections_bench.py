@@ -0,0 +1,70 @@
+"""Задержка запроса при разных режимах работы с соединениями.
+
+Каждый режим запускается в отдельном процессе с DB_CONN_MODE=<режим>. «Запрос»
+имитируется сигналами request_started/request_finished, между которыми выполняется
+один SELECT — ровно то, что делает обработчик Django вокруг view.
+
+    python benchmarks/db_connections_bench.py --requests 2000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = ('plain', 'persistent', 'pool')
+
+
+def worker(total):
+    import django
+
+    django.setup()
+
+    from django.core import signals
+    from django.db import connection
+
+    latencies = []
+    for _ in range(total):
+        started = time.perf_counter()
+        signals.request_started.send(sender=None)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        signals.request_finished.send(sender=None)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    print('{:<11} p50={:.3f}ms p99={:.3f}ms mean={:.3f}ms'.format(
+        os.environ['DB_CONN_MODE'],
+        statistics.median(latencies),
+        latencies[int(len(latencies) * 0.99) - 1],
+        statistics.mean(latencies),
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--modes', nargs='+', default=MODES)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.requests)
+        return
+
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for mode in args.modes:
+        env = dict(os.environ, DB_CONN_MODE=mode, DJANGO_SETTINGS_MODULE='config.settings')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [project_dir, env.get('PYTHONPATH')]))
+        subprocess.run(
+            [sys.executable, __file__, '--worker', '--requests', str(args.requests)],
+            env=env,
+            cwd=project_dir,
+            check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
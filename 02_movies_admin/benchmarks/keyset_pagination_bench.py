@@ -0,0 +1,120 @@
+"""Глубокие страницы списка фильмов: OFFSET и два вида условия keyset-пагинации.
+
+Условия для сортировки (title, id), страница после строки (value, pk):
+    or     — title > value OR (title = value AND id > pk), прежний вариант;
+    range  — title >= value AND (title > value OR id > pk), как в movies.pagination.seek.
+
+Для каждой глубины выводятся задержки p50/p99, а для самой глубокой страницы —
+EXPLAIN (ANALYZE, BUFFERS) каждого варианта: у range в Index Cond индекса по title
+должна стоять граница title >= value, у or её нет, и индекс читается с начала.
+
+    python benchmarks/keyset_pagination_bench.py --films 1000000 --depths 1000,100000,900000
+
+Подключение берётся из тех же переменных окружения, что и у проекта (DB_NAME, DB_USER...).
+"""
+import argparse
+import os
+import statistics
+import time
+
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+dsn = {
+    'user': os.environ.get('DB_USER'),
+    'password': os.environ.get('DB_PASSWORD'),
+    'host': os.environ.get('DB_HOST', '127.0.0.1'),
+    'port': os.environ.get('DB_PORT', 5432),
+    'dbname': os.environ.get('DB_NAME'),
+}
+
+SCHEMA = 'bench_keyset'
+
+SELECT = f'SELECT id, title FROM {SCHEMA}.film_work '
+
+QUERIES = {
+    'offset': SELECT + 'ORDER BY title, id OFFSET %(depth)s LIMIT %(size)s',
+    'or': SELECT + ('WHERE title > %(title)s OR (title = %(title)s AND id > %(pk)s) '
+                    'ORDER BY title, id LIMIT %(size)s'),
+    'range': SELECT + ('WHERE title >= %(title)s AND (title > %(title)s OR id > %(pk)s) '
+                       'ORDER BY title, id LIMIT %(size)s'),
+}
+
+
+def prepare(cursor, films, titles):
+    # Названия повторяются: у одного title несколько строк, как у ремейков
+    cursor.execute(f"""
+        DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+        CREATE SCHEMA {SCHEMA};
+        CREATE TABLE {SCHEMA}.film_work (id uuid PRIMARY KEY, title text NOT NULL);
+        INSERT INTO {SCHEMA}.film_work
+        SELECT gen_random_uuid(), 'Film ' || lpad((n %% %s)::text, 8, '0')
+        FROM generate_series(0, %s) n;
+        CREATE INDEX film_work_title_idx ON {SCHEMA}.film_work (title);
+        ANALYZE {SCHEMA}.film_work;
+    """, [titles, films - 1])
+
+
+def page_start(cursor, depth):
+    """Последняя строка перед страницей на глубине depth — то, что лежит в курсоре."""
+    cursor.execute(SELECT + 'ORDER BY title, id OFFSET %s LIMIT 1', [depth - 1])
+    pk, title = cursor.fetchone()
+    return {'depth': depth, 'title': title, 'pk': pk}
+
+
+def measure(cursor, sql, params, repeat):
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--films', type=int, default=1_000_000)
+    parser.add_argument('--titles', type=int, default=200_000, help='различных названий')
+    parser.add_argument('--depths', default='1000,100000,900000')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    depths = [int(depth) for depth in args.depths.split(',')]
+    with psycopg2.connect(**dsn) as conn, conn.cursor() as cursor:
+        prepare(cursor, args.films, args.titles)
+        conn.commit()
+
+        results = {}
+        for depth in depths:
+            params = {**page_start(cursor, depth), 'size': args.page_size}
+            pages = {}
+            for name, sql in QUERIES.items():
+                results[depth, name] = measure(cursor, sql, params, args.repeat)
+                cursor.execute(sql, params)
+                pages[name] = cursor.fetchall()
+            if pages['or'] != pages['range'] or pages['or'] != pages['offset']:
+                raise RuntimeError(f'different pages at depth {depth}')
+            print(f'depth {depth}: done', flush=True)
+
+        for name, sql in QUERIES.items():
+            cursor.execute('EXPLAIN (ANALYZE, BUFFERS) ' + sql, params)
+            print(f'\n{name}, depth {depths[-1]}:')
+            for (line,) in cursor.fetchall():
+                print(f'  {line}')
+
+        cursor.execute(f'DROP SCHEMA {SCHEMA} CASCADE')
+        conn.commit()
+
+    print(f'\n{"depth":>10}' + ''.join(f'{name:>22}' for name in QUERIES))
+    for depth in depths:
+        cells = ['{:.2f} / {:.2f} ms'.format(*results[depth, name]) for name in QUERIES]
+        print(f'{depth:>10}' + ''.join(f'{cell:>22}' for cell in cells))
+
+
+if __name__ == '__main__':
+    main()
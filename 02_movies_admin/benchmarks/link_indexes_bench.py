@@ -0,0 +1,170 @@
+"""Запросы к таблицам связей до и после пересмотра индексов (movies.0003).
+
+До: первичный ключ, уникальное ограничение (film_work_id, person_id/genre_id) и
+дублирующий его индекс film_work_*_idx, индексов по person_id и genre_id нет.
+После: дубликат удалён, добавлены индексы по person_id и genre_id.
+
+Замеряются скорость вставки в таблицы связей и задержки (p50/p99) запросов
+«фильмы персоны», «фильмы жанра» и каскадного удаления персоны (в откатываемой
+транзакции). Нужен PostgreSQL 13+ (gen_random_uuid).
+
+    python benchmarks/link_indexes_bench.py --links 5000000
+
+Подключение берётся из тех же переменных окружения, что и у проекта (DB_NAME, DB_USER...).
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+import psycopg2
+import psycopg2.extras
+from dotenv import load_dotenv
+
+load_dotenv()
+
+dsn = {
+    'user': os.environ.get('DB_USER'),
+    'password': os.environ.get('DB_PASSWORD'),
+    'host': os.environ.get('DB_HOST', '127.0.0.1'),
+    'port': os.environ.get('DB_PORT', 5432),
+    'dbname': os.environ.get('DB_NAME'),
+}
+
+SCHEMA = 'bench_indexes'
+
+LAYOUTS = {
+    'before': (
+        'CREATE INDEX film_work_person_idx ON {schema}.person_film_work (film_work_id, person_id)',
+        'CREATE INDEX film_work_genre_idx ON {schema}.genre_film_work (film_work_id, genre_id)',
+    ),
+    'after': (
+        'CREATE INDEX person_film_work_person_id_idx ON {schema}.person_film_work (person_id)',
+        'CREATE INDEX genre_film_work_genre_id_idx ON {schema}.genre_film_work (genre_id)',
+    ),
+}
+
+# Запрос и таблица, из которой берутся значения параметра
+QUERIES = {
+    'films of person': (
+        'SELECT film_work_id FROM {schema}.person_film_work WHERE person_id = %s', 'person',
+    ),
+    'films of genre': (
+        'SELECT film_work_id FROM {schema}.genre_film_work WHERE genre_id = %s', 'genre',
+    ),
+    'delete person': ('DELETE FROM {schema}.person WHERE id = %s', 'person'),
+}
+
+
+def prepare(cursor, layout, films, persons, genres):
+    cursor.execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}')
+    for table, count in (('film_work', films), ('person', persons), ('genre', genres)):
+        cursor.execute(f'CREATE TABLE {SCHEMA}.{table} (id uuid PRIMARY KEY, n int UNIQUE)')
+        cursor.execute(f'INSERT INTO {SCHEMA}.{table} '
+                       f'SELECT gen_random_uuid(), n FROM generate_series(0, %s) n', [count - 1])
+
+    for table, other, extra in (('person_film_work', 'person', ', role text NOT NULL'),
+                                ('genre_film_work', 'genre', '')):
+        cursor.execute(f"""
+            CREATE TABLE {SCHEMA}.{table} (
+                id uuid PRIMARY KEY,
+                film_work_id uuid NOT NULL
+                    REFERENCES {SCHEMA}.film_work(id) ON DELETE CASCADE,
+                {other}_id uuid NOT NULL REFERENCES {SCHEMA}.{other}(id) ON DELETE CASCADE
+                {extra},
+                created timestamp with time zone,
+                CONSTRAINT film_work_{other}_unq UNIQUE (film_work_id, {other}_id)
+            )
+        """)
+    for sql in LAYOUTS[layout]:
+        cursor.execute(sql.format(schema=SCHEMA))
+
+
+def load(conn, cursor, links, films, persons, genres, batch):
+    # Строка g связывает фильм g % films с персоной/жанром (g / films) % count
+    started = time.perf_counter()
+    for offset in range(0, links, batch):
+        bounds = [offset, min(offset + batch, links) - 1]
+        cursor.execute(f"""
+            INSERT INTO {SCHEMA}.person_film_work
+            SELECT gen_random_uuid(), f.id, p.id, 'actor', now()
+            FROM generate_series(%s, %s) g
+            JOIN {SCHEMA}.film_work f ON f.n = g %% %s
+            JOIN {SCHEMA}.person p ON p.n = (g / %s) %% %s
+        """, [*bounds, films, films, persons])
+        cursor.execute(f"""
+            INSERT INTO {SCHEMA}.genre_film_work
+            SELECT gen_random_uuid(), f.id, r.id, now()
+            FROM generate_series(%s, %s) g
+            JOIN {SCHEMA}.film_work f ON f.n = g %% %s
+            JOIN {SCHEMA}.genre r ON r.n = (g / %s) %% %s
+            WHERE g / %s < %s
+        """, [*bounds, films, films, genres, films, genres])
+        conn.commit()
+    elapsed = time.perf_counter() - started
+
+    conn.autocommit = True
+    cursor.execute(f'VACUUM ANALYZE {SCHEMA}.person_film_work, {SCHEMA}.genre_film_work')
+    conn.autocommit = False
+    return links / elapsed
+
+
+def measure(conn, cursor, query, table, count, repeat):
+    cursor.execute(f'SELECT id FROM {SCHEMA}.{table} WHERE n = ANY(%s)',
+                   [random.sample(range(count), min(repeat, count))])
+    ids = [row[0] for row in cursor.fetchall()]
+
+    latencies = []
+    for pk in ids:
+        started = time.perf_counter()
+        cursor.execute(query.format(schema=SCHEMA), [pk])
+        if cursor.description:
+            cursor.fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+        # Удаление откатывается, чтобы все замеры шли на одних и тех же данных
+        conn.rollback()
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--links', type=int, default=5_000_000)
+    parser.add_argument('--films', type=int, default=500_000)
+    parser.add_argument('--persons', type=int, default=200_000)
+    parser.add_argument('--genres', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    psycopg2.extras.register_uuid()
+    results = {}
+    with psycopg2.connect(**dsn) as conn, conn.cursor() as cursor:
+        for layout in LAYOUTS:
+            prepare(cursor, layout, args.films, args.persons, args.genres)
+            conn.commit()
+            rate = load(conn, cursor, args.links, args.films, args.persons, args.genres,
+                        args.batch)
+            results[layout, 'insert rows/s'] = (rate,)
+            counts = {'person': args.persons, 'genre': args.genres}
+            for name, (query, table) in QUERIES.items():
+                results[layout, name] = measure(
+                    conn, cursor, query, table, counts[table], args.repeat,
+                )
+            print(f'{layout}: done', flush=True)
+        cursor.execute(f'DROP SCHEMA {SCHEMA} CASCADE')
+        conn.commit()
+
+    print(f'\n{"metric":<18}{"before":>22}{"after":>22}')
+    for metric in ['insert rows/s', *QUERIES]:
+        cells = []
+        for layout in LAYOUTS:
+            values = results[layout, metric]
+            cells.append(f'{values[0]:,.0f}' if len(values) == 1 else
+                         '{:.3f} / {:.3f} ms'.format(*values))
+        print(f'{metric:<18}{cells[0]:>22}{cells[1]:>22}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""Вставка и поиск в person_film_work: обычная таблица против hash-секций.
+
+Для каждой схемы создаётся отдельная схема bench_plain / bench_hash с синтетическими
+film_work и person, затем таблица связей наполняется пачками INSERT ... SELECT
+из generate_series. Замеряются скорость вставки, время VACUUM ANALYZE и задержка
+выборки всех участников фильма по film_work_id. Нужен PostgreSQL 13+ (gen_random_uuid).
+
+    python benchmarks/link_partitioning_bench.py --rows 100000000 --partitions 16
+
+Подключение берётся из тех же переменных окружения, что и у проекта (DB_NAME, DB_USER...).
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+import psycopg2
+import psycopg2.extras
+from dotenv import load_dotenv
+
+load_dotenv()
+
+dsn = {
+    'user': os.environ.get('DB_USER'),
+    'password': os.environ.get('DB_PASSWORD'),
+    'host': os.environ.get('DB_HOST', '127.0.0.1'),
+    'port': os.environ.get('DB_PORT', 5432),
+    'dbname': os.environ.get('DB_NAME'),
+}
+
+
+def prepare(cursor, schema, films, persons, partitions):
+    cursor.execute(f'DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema}')
+    for table, count in (('film_work', films), ('person', persons)):
+        cursor.execute(f'CREATE TABLE {schema}.{table} (id uuid PRIMARY KEY, n int UNIQUE)')
+        cursor.execute(f'INSERT INTO {schema}.{table} '
+                       f'SELECT gen_random_uuid(), n FROM generate_series(0, %s) n', [count - 1])
+
+    partition_by = 'PARTITION BY HASH (film_work_id)' if partitions else ''
+    primary_key = '(id, film_work_id)' if partitions else '(id)'
+    cursor.execute(f"""
+        CREATE TABLE {schema}.person_film_work (
+            id uuid NOT NULL,
+            film_work_id uuid NOT NULL REFERENCES {schema}.film_work(id) ON DELETE CASCADE,
+            person_id uuid NOT NULL REFERENCES {schema}.person(id) ON DELETE CASCADE,
+            role text NOT NULL,
+            created timestamp with time zone,
+            PRIMARY KEY {primary_key}
+        ) {partition_by}
+    """)
+    for remainder in range(partitions):
+        cursor.execute(f'CREATE TABLE {schema}.person_film_work_p{remainder} '
+                       f'PARTITION OF {schema}.person_film_work '
+                       f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})')
+    cursor.execute(f'CREATE UNIQUE INDEX ON {schema}.person_film_work (film_work_id, person_id)')
+
+
+def load(conn, cursor, schema, rows, films, persons, batch):
+    # Строка g связывает фильм g % films с персоной (g / films) % persons:
+    # пары не повторяются, пока rows <= films * persons
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        cursor.execute(f"""
+            INSERT INTO {schema}.person_film_work
+            SELECT gen_random_uuid(), f.id, p.id, 'actor', now()
+            FROM generate_series(%s, %s) g
+            JOIN {schema}.film_work f ON f.n = g %% %s
+            JOIN {schema}.person p ON p.n = (g / %s) %% %s
+        """, [offset, min(offset + batch, rows) - 1, films, films, persons])
+        conn.commit()
+        done = min(offset + batch, rows)
+        elapsed = time.perf_counter() - started
+        print(f'  {schema}: {done} rows, {done / elapsed:,.0f} rows/s', flush=True)
+    return rows / (time.perf_counter() - started)
+
+
+def vacuum(conn, schema):
+    conn.autocommit = True
+    started = time.perf_counter()
+    with conn.cursor() as cursor:
+        cursor.execute(f'VACUUM ANALYZE {schema}.person_film_work')
+    conn.autocommit = False
+    return time.perf_counter() - started
+
+
+def lookups(cursor, schema, films, count):
+    cursor.execute(f'SELECT id FROM {schema}.film_work WHERE n = ANY(%s)',
+                   [random.sample(range(films), min(count, films))])
+    film_ids = [row[0] for row in cursor.fetchall()]
+
+    latencies = []
+    for film_id in film_ids:
+        started = time.perf_counter()
+        cursor.execute(f'SELECT person_id, role FROM {schema}.person_film_work '
+                       f'WHERE film_work_id = %s', [film_id])
+        cursor.fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000_000)
+    parser.add_argument('--films', type=int, default=2_000_000)
+    parser.add_argument('--persons', type=int, default=1_000_000)
+    parser.add_argument('--partitions', type=int, default=16)
+    parser.add_argument('--batch', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--keep', action='store_true', help='не удалять схемы после замера')
+    args = parser.parse_args()
+
+    psycopg2.extras.register_uuid()
+    results = {}
+    with psycopg2.connect(**dsn) as conn, conn.cursor() as cursor:
+        for schema, partitions in (('bench_plain', 0), ('bench_hash', args.partitions)):
+            prepare(cursor, schema, args.films, args.persons, partitions)
+            conn.commit()
+            insert_rate = load(
+                conn, cursor, schema, args.rows, args.films, args.persons, args.batch,
+            )
+            vacuum_time = vacuum(conn, schema)
+            p50, p99 = lookups(cursor, schema, args.films, args.lookups)
+            results[schema] = (insert_rate, vacuum_time, p50, p99)
+            if not args.keep:
+                cursor.execute(f'DROP SCHEMA {schema} CASCADE')
+                conn.commit()
+
+    print(f'\n{"layout":<12}{"insert rows/s":>16}{"vacuum, s":>12}{"p50, ms":>10}{"p99, ms":>10}')
+    for schema, (insert_rate, vacuum_time, p50, p99) in results.items():
+        print(f'{schema:<12}{insert_rate:>16,.0f}{vacuum_time:>12.1f}{p50:>10.3f}{p99:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
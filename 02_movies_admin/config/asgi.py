@@ -9,8 +9,31 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+URLCONF = 'config.asgi_urls'
+
+
+class BatchASGIHandler(ASGIHandler):
+    """Разрешает запросы только по config.asgi_urls, остальные получают 404.
+
+    Под ASGI обслуживаются только асинхронные /api/v1/movies/batch/ и
+    /api/v1/persons/batch/, админка и остальное API остаются на WSGI (config.wsgi).
+    Django 3.2 перебирает StreamingHttpResponse прямо в цикле событий, и выгрузки
+    CSV/JSON Lines из админки, читающие базу по ходу отдачи, упали бы
+    с SynchronousOnlyOperation.
+    """
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = URLCONF
+        return request, error_response
+
+
+# То же, что get_asgi_application(), но со своим обработчиком
+django.setup(set_prefix=False)
+application = BatchASGIHandler()
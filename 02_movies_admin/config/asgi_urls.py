@@ -0,0 +1,11 @@
+"""Маршруты приложения под ASGI (config.asgi).
+
+Только асинхронные batch-эндпоинты API, остальное обслуживается под WSGI по config.urls.
+"""
+from django.urls import path
+from movies.api.v1 import views
+
+urlpatterns = [
+    path('api/v1/movies/batch/', views.movies_batch),
+    path('api/v1/persons/batch/', views.persons_batch),
+]
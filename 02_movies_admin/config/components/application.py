@@ -1,3 +1,4 @@
+import os
 
 # Application definition
 
@@ -12,6 +13,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы учитывать запросы к базе из всех остальных middleware
+    'config.middleware.SQLInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -40,3 +43,6 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+
+# Пагинация списков админки movies: offset (номера страниц) или keyset (переход по ключу)
+MOVIES_ADMIN_PAGINATION = os.environ.get('MOVIES_ADMIN_PAGINATION', 'offset')
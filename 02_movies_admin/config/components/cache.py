@@ -0,0 +1,28 @@
+import os
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# По умолчанию кэш живёт в памяти процесса. Для общего кэша между воркерами
+# укажите CACHE_LOCATION, например 127.0.0.1:11211 (нужен пакет pymemcache).
+if os.environ.get('CACHE_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Время жизни ответов API фильмов, в секундах
+MOVIES_API_CACHE_TIMEOUT = int(os.environ.get('MOVIES_API_CACHE_TIMEOUT', 60))
+
+# Справочник жанров: алиас общего кэша (None — только память процесса)
+# и время жизни локальной копии, если общего кэша нет
+GENRE_CACHE_ALIAS = 'default' if os.environ.get('CACHE_LOCATION') else None
+GENRE_CACHE_TIMEOUT = int(os.environ.get('GENRE_CACHE_TIMEOUT', 300))
@@ -5,7 +5,7 @@ import os
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'config.db.postgresql',
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASSWORD'),
@@ -17,3 +17,38 @@ DATABASES = {
         }
     }
 }
+
+# Режим работы с соединениями:
+#   plain      — новое соединение на каждый запрос;
+#   persistent — соединение живёт DB_CONN_MAX_AGE секунд и проверяется перед переиспользованием;
+#   pool       — пул соединений внутри процесса (config.db.postgresql.pool);
+#   pgbouncer  — соединения к pgbouncer в режиме transaction pooling.
+DB_CONN_MODE = os.environ.get('DB_CONN_MODE', 'plain')
+
+if DB_CONN_MODE == 'persistent':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+    })
+elif DB_CONN_MODE == 'pool':
+    DATABASES['default'].update({
+        # Соединение возвращается в пул в конце каждого запроса
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+            'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 3600)),
+        },
+    })
+elif DB_CONN_MODE == 'pgbouncer':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        # Серверные курсоры не переживают смену серверного соединения в transaction pooling
+        'DISABLE_SERVER_SIDE_CURSORS': True,
+    })
+
+# Число hash-секций таблиц связей genre_film_work и person_film_work (0 — без секций).
+# Учитывается при применении миграции movies.0002_partition_link_tables.
+MOVIES_LINK_TABLE_PARTITIONS = int(os.environ.get('MOVIES_LINK_TABLE_PARTITIONS', 0))
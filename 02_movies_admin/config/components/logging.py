@@ -0,0 +1,28 @@
+import os
+
+# Logging
+# https://docs.djangoproject.com/en/3.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # Статистика SQL по запросам и медленные запросы, см. config.middleware
+        'config.middleware': {
+            'handlers': ['console'],
+            'level': os.environ.get('SQL_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Порог медленного запроса в миллисекундах, сколько самых медленных запросов
+# показывать в логе запроса и нужно ли логировать их EXPLAIN
+SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 200))
+SQL_SLOWEST_QUERIES = int(os.environ.get('SQL_SLOWEST_QUERIES', 3))
+SQL_EXPLAIN_SLOW_QUERIES = os.environ.get('SQL_EXPLAIN_SLOW_QUERIES', 'true').lower() == 'true'
@@ -0,0 +1,80 @@
+"""Бэкенд PostgreSQL с проверкой постоянных соединений и пулом внутри процесса.
+
+Совместим со стандартным бэкендом Django и дополнительно читает ключи DATABASES:
+
+* ``CONN_HEALTH_CHECKS`` — перед переиспользованием соединения в новом запросе
+  проверять его запросом ``SELECT 1`` (как в Django 4.1);
+* ``POOL`` — словарь параметров ``ConnectionPool``; если задан, соединения берутся
+  из пула и возвращаются в него вместо закрытия.
+"""
+from functools import partial
+
+import psycopg2.extras
+from django.db.backends.postgresql import base
+
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+
+    @property
+    def pool(self):
+        options = self.settings_dict.get('POOL')
+        if not options:
+            return None
+        return get_pool(
+            self.alias,
+            partial(base.Database.connect, **self.get_connection_params()),
+            health_checks=self.settings_dict.get('CONN_HEALTH_CHECKS', False),
+            **options,
+        )
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        connection = pool.getconn()
+
+        # Повторяем настройку из стандартного бэкенда: соединение могло прийти из пула
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def connect(self):
+        # Свежее соединение проверять не нужно. Флаг ставится до connect(): внутри него
+        # set_autocommit() вызывает ensure_connection(), и SELECT 1 открыл бы транзакцию
+        self.health_check_done = True
+        super().connect()
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+
+    def ensure_connection(self):
+        # Соединение, пережившее прошлый запрос, проверяем при первом обращении в новом
+        if (self.connection is not None
+                and self.settings_dict.get('CONN_HEALTH_CHECKS')
+                and not self.health_check_done):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Пул соединений psycopg2 внутри процесса.
+
+    Соединение выдаётся на время запроса и возвращается при закрытии соединения Django.
+    Простаивающие соединения хранятся в стеке, чтобы чаще переиспользовались «тёплые».
+    """
+
+    def __init__(self, connect, max_size=10, timeout=5.0, max_lifetime=None, health_checks=False):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_checks = health_checks
+
+        self._idle = deque()
+        self._born = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'released': 0,
+            'discarded': 0,
+            'timeouts': 0,
+            'wait_time_ms': 0.0,
+        }
+
+    def _is_stale(self, conn):
+        if conn.closed:
+            return True
+        if self.max_lifetime is not None:
+            return time.monotonic() - self._born[id(conn)] >= self.max_lifetime
+        return False
+
+    def _is_healthy(self, conn):
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _discard(self, conn):
+        self._born.pop(id(conn), None)
+        self._stats['discarded'] += 1
+        if not conn.closed:
+            conn.close()
+
+    def getconn(self):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise psycopg2.OperationalError(
+                'connection pool exhausted: {} connections in use'.format(self.max_size)
+            )
+
+        try:
+            with self._lock:
+                self._stats['wait_time_ms'] += (time.monotonic() - started) * 1000
+                while self._idle:
+                    conn = self._idle.pop()
+                    if self._is_stale(conn):
+                        self._discard(conn)
+                        continue
+                    break
+                else:
+                    conn = None
+
+            if conn is not None and self.health_checks and not self._is_healthy(conn):
+                with self._lock:
+                    self._discard(conn)
+                conn = None
+
+            if conn is None:
+                conn = self.connect()
+                with self._lock:
+                    self._born[id(conn)] = time.monotonic()
+                    self._stats['created'] += 1
+            else:
+                with self._lock:
+                    self._stats['reused'] += 1
+            return conn
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn):
+        try:
+            status = extensions.TRANSACTION_STATUS_UNKNOWN
+            if not conn.closed:
+                status = conn.info.transaction_status
+                if status not in (extensions.TRANSACTION_STATUS_IDLE,
+                                  extensions.TRANSACTION_STATUS_UNKNOWN):
+                    # Незавершённая транзакция не должна достаться следующему запросу
+                    try:
+                        conn.rollback()
+                        status = conn.info.transaction_status
+                    except psycopg2.Error:
+                        status = extensions.TRANSACTION_STATUS_UNKNOWN
+
+            with self._lock:
+                if status == extensions.TRANSACTION_STATUS_UNKNOWN or self._is_stale(conn):
+                    self._discard(conn)
+                else:
+                    self._idle.append(conn)
+                    self._stats['released'] += 1
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        with self._lock:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def stats(self):
+        with self._lock:
+            idle = len(self._idle)
+            stats = dict(self._stats)
+            stats.update({
+                'max_size': self.max_size,
+                'idle': idle,
+                'in_use': len(self._born) - idle,
+            })
+        return stats
+
+
+def get_pool(alias, connect, **options):
+    """Возвращает пул для алиаса базы, создавая его при первом обращении.
+
+    Пул привязан к pid: после fork воркера соединения родителя не переиспользуются.
+    """
+    key = (alias, os.getpid())
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(connect, **options)
+    return pool
+
+
+def pool_stats():
+    pid = os.getpid()
+    return {alias: pool.stats() for (alias, owner), pool in list(_pools.items()) if owner == pid}
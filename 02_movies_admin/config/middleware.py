@@ -0,0 +1,176 @@
+import asyncio
+import heapq
+import json
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+
+class QueryRecorder:
+    """execute_wrapper, считающий запросы, их суммарное время и самые медленные из них."""
+
+    def __init__(self, slow_ms, top, explain):
+        self.slow_ms = slow_ms
+        self.top = top
+        self.explain = explain
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            # Куча на top элементов: минимальный вытесняется при появлении более медленного
+            entry = (duration, self.count, sql)
+            if len(self.slowest) < self.top:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heappushpop(self.slowest, entry)
+
+        if duration * 1000 >= self.slow_ms:
+            self.log_slow_query(context['connection'], sql, params, many, duration)
+        return result
+
+    def log_slow_query(self, connection, sql, params, many, duration):
+        plan = None
+        if self.explain and not many and sql.lstrip().upper().startswith(EXPLAINABLE):
+            plan = self.explain_plan(connection, sql, params)
+
+        logger.warning(json.dumps({
+            'event': 'slow_query',
+            'database': connection.alias,
+            'duration_ms': round(duration * 1000, 2),
+            'sql': sql,
+            'plan': plan,
+        }, ensure_ascii=False))
+
+    def explain_plan(self, connection, sql, params):
+        self.explaining = True
+        try:
+            # Внутри транзакции ошибка EXPLAIN не должна сломать её, поэтому savepoint
+            with ExitStack() as stack:
+                if connection.in_atomic_block:
+                    stack.enter_context(transaction.atomic(using=connection.alias))
+                with connection.cursor() as cursor:
+                    cursor.execute('EXPLAIN ' + sql, params)
+                    return [row[0] for row in cursor.fetchall()]
+        except DatabaseError:
+            return None
+        finally:
+            self.explaining = False
+
+    def stats(self):
+        return {
+            'queries': self.count,
+            'db_ms': round(self.duration * 1000, 2),
+            'slowest': [
+                {'duration_ms': round(duration * 1000, 2), 'sql': sql}
+                for duration, _, sql in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+# Recorder текущего HTTP-запроса. Контекстная переменная копируется в потоки sync_to_async,
+# поэтому запросы учитываются и под ASGI, где ORM работает в общем синхронном потоке со
+# своими соединениями, и при нескольких запросах, обрабатываемых одновременно
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    # В начало списка: execute_wrapper() снимает временные обёртки через pop()
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class SQLInstrumentationMiddleware:
+    """Число запросов и время в базе для каждого запроса.
+
+    Пишет заголовок Server-Timing и строку структурированного лога. Запросы, выполненные
+    при отдаче StreamingHttpResponse, уже после возврата из view, не учитываются.
+    Работает и под ASGI, не заставляя Django оборачивать асинхронные view в async_to_sync.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так же, как MiddlewareMixin: внешний слой должен видеть корутину
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+        connection_created.connect(install_query_recorder,
+                                   dispatch_uid='config.middleware.install_query_recorder')
+        for connection in connections.all():
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        recorder = self.get_recorder()
+        started = time.perf_counter()
+        token = current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.process_response(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = self.get_recorder()
+        started = time.perf_counter()
+        token = current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.process_response(request, response, recorder, started)
+
+    def get_recorder(self):
+        return QueryRecorder(
+            slow_ms=settings.SQL_SLOW_QUERY_MS,
+            top=settings.SQL_SLOWEST_QUERIES,
+            explain=settings.SQL_EXPLAIN_SLOW_QUERIES,
+        )
+
+    def process_response(self, request, response, recorder, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        stats = recorder.stats()
+        response['Server-Timing'] = 'db;dur={:.2f};desc="{} queries", app;dur={:.2f}'.format(
+            stats['db_ms'], stats['queries'], total_ms,
+        )
+        logger.info(json.dumps({
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 2),
+            **stats,
+        }, ensure_ascii=False))
+        return response
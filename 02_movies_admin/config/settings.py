@@ -49,6 +49,14 @@ include(
 )
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+include(
+    'components/cache.py',
+)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -65,6 +73,14 @@ include(
 )
 
 
+# Logging
+# https://docs.djangoproject.com/en/3.2/topics/logging/
+
+include(
+    'components/logging.py',
+)
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
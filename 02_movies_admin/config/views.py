@@ -0,0 +1,13 @@
+from config.db.postgresql.pool import pool_stats
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from movies.cache import genre_catalogue
+
+
+@staff_member_required
+def metrics(request):
+    """Внутренние метрики текущего процесса для сотрудников."""
+    return JsonResponse({
+        'db_pool': pool_stats(),
+        'genre_cache': genre_catalogue.stats(),
+    })
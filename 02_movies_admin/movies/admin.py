@@ -1,11 +1,35 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.db import transaction
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
 
+from .cache import genre_catalogue
+from .changelist import KeysetPaginationMixin
+from .export import export_response
+from .forms import (BulkCreditsForm, BulkGenresForm, BulkPersonsForm,
+                    BulkRatingForm)
 from .models import Filmwork, Genre, GenreFilmwork, Person, PersonFilmwork
 
 
+class GenreListFilter(admin.RelatedFieldListFilter):
+
+    def field_choices(self, field, request, model_admin):
+        return genre_catalogue.choices()
+
+
 class GenreFilmworkInline(admin.TabularInline):
     model = GenreFilmwork
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'genre':
+            # Варианты выбора из справочника вместо запроса на каждую строку инлайна
+            formfield.choices = [('', formfield.empty_label)] + genre_catalogue.choices()
+        return formfield
+
 
 class PersonFilmworkInline(admin.TabularInline):
     model = PersonFilmwork
@@ -19,8 +43,9 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 @admin.register(Person)
-class PersonAdmin(admin.ModelAdmin):
+class PersonAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     ordering = ['full_name']
+    keyset_field = 'full_name'
     search_fields = ['full_name']
 
     list_display = ('full_name', 'created', 'modified')
@@ -28,14 +53,129 @@ class PersonAdmin(admin.ModelAdmin):
 
 
 @admin.register(Filmwork)
-class FilmworkAdmin(admin.ModelAdmin):
+class FilmworkAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     inlines = (GenreFilmworkInline, PersonFilmworkInline)
+    keyset_field = 'title'
 
     # Отображение полей в списке
     list_display = ('title', 'type', 'creation_date', 'rating', 'created', 'modified')
 
     # Фильтрация в списке
-    list_filter = ('type', 'genres', 'creation_date', 'rating')
+    list_filter = ('type', ('genres', GenreListFilter), 'creation_date', 'rating')
 
     # Поиск по полям
     search_fields = ('title', 'description', 'id',)
+
+    # Массовые действия: одно UPDATE/INSERT/DELETE на всю выборку вместо сохранения каждого фильма
+    actions = ('set_type_movie', 'set_type_tv_show', 'set_rating',
+               'add_genres', 'remove_genres', 'add_persons', 'remove_persons',
+               'export_csv', 'export_jsonl')
+
+    def bulk_form_action(self, request, queryset, form_class, title, apply, touch_modified=True):
+        """Показывает промежуточную форму действия и применяет его к выбранным фильмам.
+
+        touch_modified=False — apply сам выставляет modified в том же UPDATE.
+        """
+        if 'apply' in request.POST:
+            form = form_class(request.POST)
+            if form.is_valid():
+                film_ids = list(queryset.values_list('pk', flat=True))
+                with transaction.atomic():
+                    apply(film_ids, form.cleaned_data)
+                    if touch_modified:
+                        # Действия над связями не трогают строки фильмов, а modified
+                        # не обновляется сам при bulk-операциях, поэтому выставляем явно
+                        Filmwork.objects.filter(pk__in=film_ids).update(modified=timezone.now())
+                self.message_updated(request, len(film_ids))
+                return None
+        else:
+            form = form_class()
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'form': form,
+            'opts': self.model._meta,
+            'queryset': queryset,
+            'action': request.POST['action'],
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            'media': self.media + form.media,
+        }
+        return TemplateResponse(request, 'admin/movies/filmwork/bulk_action.html', context)
+
+    def message_updated(self, request, count):
+        self.message_user(request, ngettext(
+            '%(count)d film work updated.',
+            '%(count)d film works updated.',
+            count,
+        ) % {'count': count}, messages.SUCCESS)
+
+    def update_type(self, request, queryset, film_type):
+        film_ids = list(queryset.values_list('pk', flat=True))
+        Filmwork.objects.filter(pk__in=film_ids).update(type=film_type, modified=timezone.now())
+        self.message_updated(request, len(film_ids))
+
+    @admin.action(description=_('Set type: movie'), permissions=['change'])
+    def set_type_movie(self, request, queryset):
+        self.update_type(request, queryset, Filmwork.Type.MOVIE)
+
+    @admin.action(description=_('Set type: TV show'), permissions=['change'])
+    def set_type_tv_show(self, request, queryset):
+        self.update_type(request, queryset, Filmwork.Type.TV_SHOW)
+
+    @admin.action(description=_('Set rating'), permissions=['change'])
+    def set_rating(self, request, queryset):
+        def apply(film_ids, data):
+            Filmwork.objects.filter(pk__in=film_ids).update(
+                rating=data['rating'], modified=timezone.now(),
+            )
+        return self.bulk_form_action(request, queryset, BulkRatingForm, _('Set rating'), apply,
+                                     touch_modified=False)
+
+    @admin.action(description=_('Add genres'), permissions=['change'])
+    def add_genres(self, request, queryset):
+        def apply(film_ids, data):
+            # Уже существующие связи отсекает ограничение film_work_genre_unq
+            GenreFilmwork.objects.bulk_create([
+                GenreFilmwork(film_work_id=film_id, genre=genre)
+                for film_id in film_ids
+                for genre in data['genres']
+            ], ignore_conflicts=True)
+        return self.bulk_form_action(request, queryset, BulkGenresForm, _('Add genres'), apply)
+
+    @admin.action(description=_('Remove genres'), permissions=['change'])
+    def remove_genres(self, request, queryset):
+        def apply(film_ids, data):
+            GenreFilmwork.objects.filter(
+                film_work_id__in=film_ids, genre__in=data['genres'],
+            ).delete()
+        return self.bulk_form_action(request, queryset, BulkGenresForm, _('Remove genres'), apply)
+
+    @admin.action(description=_('Add persons'), permissions=['change'])
+    def add_persons(self, request, queryset):
+        def apply(film_ids, data):
+            # Уже существующие связи отсекает ограничение film_work_person_unq
+            PersonFilmwork.objects.bulk_create([
+                PersonFilmwork(film_work_id=film_id, person=person, role=data['role'])
+                for film_id in film_ids
+                for person in data['persons']
+            ], ignore_conflicts=True)
+        return self.bulk_form_action(request, queryset, BulkCreditsForm, _('Add persons'), apply)
+
+    @admin.action(description=_('Remove persons'), permissions=['change'])
+    def remove_persons(self, request, queryset):
+        def apply(film_ids, data):
+            PersonFilmwork.objects.filter(
+                film_work_id__in=film_ids, person__in=data['persons'],
+            ).delete()
+        return self.bulk_form_action(request, queryset, BulkPersonsForm, _('Remove persons'), apply)
+
+    @admin.action(description=_('Export to CSV'), permissions=['view'])
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'csv')
+
+    @admin.action(description=_('Export to JSON Lines'), permissions=['view'])
+    def export_jsonl(self, request, queryset):
+        return export_response(queryset, 'jsonl')
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (Http404, HttpResponse, HttpResponseNotAllowed,
+                         JsonResponse)
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views import View
+from movies.models import Filmwork, GenreFilmwork, Person
+from movies.pagination import decode_cursor, encode_cursor, seek
+from movies.serializers import (film_values, person_values, serialize_film,
+                                serialize_person)
+
+BATCH_MAX_IDS = 500
+
+
+class InvalidParameter(ValueError):
+    pass
+
+
+class MoviesApiMixin(View):
+    """Общая часть списка и карточки фильма: кэш, ETag и ошибки в JSON.
+
+    Наследники определяют get_data(request, **kwargs), возвращающий тело ответа.
+    """
+
+    http_method_names = ['get', 'head']
+
+    def get_queryset(self):
+        return film_values(Filmwork.objects.all())
+
+    def get(self, request, **kwargs):
+        # Ключ кэша строится по полному пути: в нём уже есть все фильтры и курсор
+        key = 'movies_api:' + hashlib.md5(request.get_full_path().encode()).hexdigest()
+        cached = cache.get(key)
+
+        if cached is None:
+            try:
+                data = self.get_data(request, **kwargs)
+            except InvalidParameter as error:
+                return JsonResponse({'error': str(error)}, status=400)
+            except Http404:
+                return JsonResponse({'error': 'not found'}, status=404)
+            body = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+            etag = '"{}"'.format(hashlib.md5(body).hexdigest())
+            cached = (etag, body)
+            cache.set(key, cached, settings.MOVIES_API_CACHE_TIMEOUT)
+
+        etag, body = cached
+
+        # If-None-Match отвечаем 304 без обращения к базе
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        patch_cache_control(response, max_age=settings.MOVIES_API_CACHE_TIMEOUT)
+        return response
+
+
+class MoviesListApi(MoviesApiMixin):
+    paginate_by = 50
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.GET.get('page_size', self.paginate_by))
+        except ValueError:
+            raise InvalidParameter('page_size must be an integer')
+        if not 0 < page_size <= self.max_page_size:
+            raise InvalidParameter(f'page_size must be between 1 and {self.max_page_size}')
+        return page_size
+
+    def filter_queryset(self, request, queryset):
+        params = request.GET
+
+        if 'type' in params:
+            if params['type'] not in Filmwork.Type.values:
+                raise InvalidParameter('unknown type')
+            queryset = queryset.filter(type=params['type'])
+
+        if 'genre' in params:
+            try:
+                genre_id = uuid.UUID(params['genre'])
+            except ValueError:
+                raise InvalidParameter('genre must be a UUID')
+            # Фильтр через подзапрос не плодит строки фильма, в отличие от join по genres
+            queryset = queryset.filter(
+                id__in=GenreFilmwork.objects.filter(genre_id=genre_id).values('film_work_id')
+            )
+
+        for param, lookup in (('rating_min', 'rating__gte'), ('rating_max', 'rating__lte')):
+            if param in params:
+                try:
+                    queryset = queryset.filter(**{lookup: float(params[param])})
+                except ValueError:
+                    raise InvalidParameter(f'{param} must be a number')
+
+        return queryset
+
+    def get_data(self, request, **kwargs):
+        page_size = self.get_page_size(request)
+        queryset = self.filter_queryset(request, self.get_queryset()).order_by('title', 'id')
+
+        # Keyset-пагинация: ищем по индексу film_work_title_idx вместо OFFSET
+        cursor = request.GET.get('cursor')
+        if cursor:
+            try:
+                title, pk = decode_cursor(cursor)
+            except ValueError as error:
+                raise InvalidParameter(str(error))
+            queryset = queryset.filter(seek('title', title, pk))
+
+        rows = list(queryset[:page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        return {
+            'results': [serialize_film(row) for row in rows],
+            'next': encode_cursor(rows[-1]['title'], rows[-1]['id']) if has_next else None,
+        }
+
+
+class MoviesDetailApi(MoviesApiMixin):
+
+    def get_data(self, request, **kwargs):
+        row = self.get_queryset().filter(id=kwargs['pk']).first()
+        if row is None:
+            raise Http404
+        return serialize_film(row)
+
+
+# В Django 3.2 у QuerySet нет асинхронных методов: запрос выполняется через sync_to_async
+# в потоке, где живёт соединение с базой, — так же устроен асинхронный ORM новых версий
+@sync_to_async
+def fetch_all(queryset):
+    return list(queryset)
+
+
+def parse_ids(request, max_ids):
+    try:
+        ids = json.loads(request.body)['ids']
+    except (ValueError, TypeError, KeyError):
+        raise InvalidParameter('body must be a JSON object with an "ids" list')
+    if not isinstance(ids, list):
+        raise InvalidParameter('ids must be a list')
+    if len(ids) > max_ids:
+        raise InvalidParameter(f'no more than {max_ids} ids per request')
+    try:
+        # Повторы убираются с сохранением порядка
+        return list(dict.fromkeys(uuid.UUID(str(pk)) for pk in ids))
+    except ValueError:
+        raise InvalidParameter('ids must be UUIDs')
+
+
+async def batch_lookup(request, queryset, serialize):
+    """Поиск многих объектов по UUID одним запросом к базе.
+
+    Принимает POST {"ids": [...]} и отвечает {"results": [...], "missing": [...]}:
+    найденные объекты в порядке запроса и идентификаторы, которых нет в базе.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        ids = parse_ids(request, BATCH_MAX_IDS)
+    except InvalidParameter as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    rows = await fetch_all(queryset.filter(id__in=ids))
+    found = {row['id']: serialize(row) for row in rows}
+    return JsonResponse({
+        'results': [found[pk] for pk in ids if pk in found],
+        'missing': [pk for pk in ids if pk not in found],
+    }, json_dumps_params={'ensure_ascii': False})
+
+
+# Асинхронные view в Django 3.2 могут быть только функциями: View.as_view и декораторы
+# вроде csrf_exempt и require_POST оборачивают их в синхронные функции
+async def movies_batch(request):
+    return await batch_lookup(request, film_values(Filmwork.objects.all()), serialize_film)
+
+
+async def persons_batch(request):
+    return await batch_lookup(request, person_values(Person.objects.all()), serialize_person)
+
+
+# То же, что делает csrf_exempt: API только читает данные и не использует сессии
+movies_batch.csrf_exempt = persons_batch.csrf_exempt = True
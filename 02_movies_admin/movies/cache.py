@@ -0,0 +1,100 @@
+import threading
+import time
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+
+
+class GenreCatalogue:
+    """Справочник жанров id → name в памяти процесса.
+
+    Если задан GENRE_CACHE_ALIAS, справочник и его версия дополнительно хранятся
+    в общем кэше: инвалидация в одном процессе сбрасывает копии во всех остальных.
+    Без общего кэша локальная копия живёт не дольше GENRE_CACHE_TIMEOUT секунд.
+    """
+
+    data_key = 'movies:genre_catalogue'
+    version_key = 'movies:genre_catalogue:version'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._genres = None
+        self._version = None
+        self._expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def shared(self):
+        alias = getattr(settings, 'GENRE_CACHE_ALIAS', None)
+        return caches[alias] if alias else None
+
+    def _load(self):
+        Genre = apps.get_model('movies', 'Genre')
+        return dict(Genre.objects.order_by('name').values_list('id', 'name'))
+
+    def _get_shared(self, shared):
+        version = shared.get(self.version_key)
+        if version is not None and version == self._version:
+            return self._genres, True
+
+        if version is not None:
+            cached = shared.get(self.data_key)
+            if cached is not None and cached[0] == version:
+                self._genres, self._version = cached[1], version
+                return self._genres, True
+        else:
+            version = uuid.uuid4().hex
+            shared.set(self.version_key, version, None)
+
+        genres = self._load()
+        shared.set(self.data_key, (version, genres), None)
+        self._genres, self._version = genres, version
+        return genres, False
+
+    def _get_local(self):
+        if self._genres is not None and time.monotonic() < self._expires_at:
+            return self._genres, True
+
+        genres = self._load()
+        self._genres = genres
+        self._expires_at = time.monotonic() + settings.GENRE_CACHE_TIMEOUT
+        return genres, False
+
+    def all(self):
+        shared = self.shared
+        with self._lock:
+            genres, hit = self._get_shared(shared) if shared else self._get_local()
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return genres
+
+    def get_name(self, genre_id):
+        return self.all().get(genre_id)
+
+    def choices(self):
+        # Словарь собран в порядке name, поэтому сортировать повторно не нужно
+        return list(self.all().items())
+
+    def invalidate(self):
+        with self._lock:
+            self._genres = None
+            self._version = None
+            self._expires_at = 0.0
+        shared = self.shared
+        if shared:
+            shared.set(self.version_key, uuid.uuid4().hex, None)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._genres) if self._genres is not None else 0,
+        }
+
+
+genre_catalogue = GenreCatalogue()
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+
+from .pagination import decode_cursor, encode_cursor, seek
+
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+
+
+class KeysetChangeList(ChangeList):
+    """Список админки с постраничным переходом по ключу сортировки вместо OFFSET.
+
+    Страница ищется условием (field, id) > (последнее значение, последний id), поэтому
+    время её получения не зависит от глубины. Вместо номеров страниц выводятся ссылки
+    «назад»/«вперёд». При сортировке по клику на столбец, «показать все» и
+    list_editable используется обычная пагинация.
+    """
+
+    keyset = False
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        lookup_params.pop(BEFORE_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        if ORDER_VAR in self.params or self.show_all or self.list_editable:
+            return super().get_results(request)
+
+        field = self.model_admin.keyset_field
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        queryset = self.queryset.order_by(field, 'pk')
+
+        after, before = self.params.get(AFTER_VAR), self.params.get(BEFORE_VAR)
+        try:
+            cursor = decode_cursor(before or after) if before or after else None
+        except ValueError:
+            raise IncorrectLookupParameters
+
+        if before:
+            # Идём назад по обратной сортировке и разворачиваем страницу
+            queryset = queryset.filter(seek(field, *cursor, backwards=True))
+            rows = list(queryset.reverse()[:self.list_per_page + 1])
+            has_previous = len(rows) > self.list_per_page
+            rows = rows[:self.list_per_page][::-1]
+            has_next = True
+        else:
+            if after:
+                queryset = queryset.filter(seek(field, *cursor))
+            rows = list(queryset[:self.list_per_page + 1])
+            has_next = len(rows) > self.list_per_page
+            rows = rows[:self.list_per_page]
+            has_previous = bool(after)
+
+        self.result_count = paginator.count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        if self.show_full_result_count:
+            self.full_result_count = self.root_queryset.count()
+        else:
+            self.full_result_count = None
+        self.show_admin_actions = not self.show_full_result_count or bool(self.full_result_count)
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = has_previous or has_next
+        self.paginator = paginator
+
+        self.keyset = True
+        self.previous_url = has_previous and rows and self.page_url(BEFORE_VAR, rows[0], field)
+        self.next_url = has_next and rows and self.page_url(AFTER_VAR, rows[-1], field)
+
+    def page_url(self, var, obj, field):
+        cursor = encode_cursor(getattr(obj, field), obj.pk)
+        return self.get_query_string({var: cursor}, remove=[AFTER_VAR, BEFORE_VAR, PAGE_VAR])
+
+
+class KeysetPaginationMixin:
+    """Включает KeysetChangeList, если MOVIES_ADMIN_PAGINATION = 'keyset'."""
+
+    # Поле сортировки; по нему должен быть индекс
+    keyset_field = None
+
+    def get_changelist(self, request, **kwargs):
+        if settings.MOVIES_ADMIN_PAGINATION == 'keyset':
+            return KeysetChangeList
+        return super().get_changelist(request, **kwargs)
@@ -0,0 +1,80 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import StreamingHttpResponse
+
+from .serializers import FILM_FIELDS, ROLE_FIELDS, film_values, serialize_film
+
+CSV_COLUMNS = FILM_FIELDS + ('genres',) + ROLE_FIELDS
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def iter_films(queryset, chunk_size=CHUNK_SIZE):
+    """Фильмы по одному, читаемые серверным курсором порциями по chunk_size строк.
+
+    Курсор открывается в транзакции: в autocommit Django объявляет его WITH HOLD, и
+    Postgres целиком вычисляет и сохраняет результат до выдачи первой строки.
+    С DISABLE_SERVER_SIDE_CURSORS (DB_CONN_MODE=pgbouncer) серверного курсора нет,
+    и весь результат загружается в память клиента перед первой строкой.
+    """
+    with transaction.atomic(using=queryset.db):
+        for row in film_values(queryset).iterator(chunk_size=chunk_size):
+            yield serialize_film(row)
+
+
+def iter_csv(films):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for film in films:
+        yield writer.writerow([
+            ', '.join(film[column]) if column in ROLE_FIELDS + ('genres',) else film[column]
+            for column in CSV_COLUMNS
+        ])
+
+
+def iter_jsonl(films):
+    for film in films:
+        yield json.dumps(film, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def batched(lines, size=500):
+    """Склеивает строки пачками, чтобы не делать отдельную запись в сокет на каждую."""
+    lines = iter(lines)
+    while True:
+        batch = ''.join(islice(lines, size))
+        if not batch:
+            return
+        yield batch
+
+
+FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'jsonl': (iter_jsonl, 'application/x-ndjson'),
+}
+
+
+def iter_export(queryset, export_format, chunk_size=CHUNK_SIZE):
+    iter_lines = FORMATS[export_format][0]
+    return batched(iter_lines(iter_films(queryset, chunk_size)))
+
+
+def export_response(queryset, export_format, filename='film_works'):
+    """Потоковая выгрузка. Строки читаются из базы во время отдачи ответа, поэтому
+    работает только под WSGI: под ASGI Django 3.2 перебирает ответ в цикле событий.
+    В режиме pgbouncer ответ начинает отдаваться только после чтения всей выборки,
+    см. iter_films."""
+    content_type = FORMATS[export_format][1]
+    response = StreamingHttpResponse(iter_export(queryset, export_format),
+                                     content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,35 @@
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelectMultiple
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils.translation import gettext_lazy as _
+
+from .cache import genre_catalogue
+from .models import Filmwork, Genre, Person
+
+
+class BulkRatingForm(forms.Form):
+    rating = forms.FloatField(label=_('rating'),
+                              required=False,
+                              validators=[MinValueValidator(0), MaxValueValidator(100)])
+
+
+class BulkGenresForm(forms.Form):
+    genres = forms.ModelMultipleChoiceField(label=_('genres'), queryset=Genre.objects.all())
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['genres'].choices = genre_catalogue.choices()
+
+
+class BulkPersonsForm(forms.Form):
+    persons = forms.ModelMultipleChoiceField(
+        label=_('persons'),
+        queryset=Person.objects.all(),
+        # Персон слишком много для обычного select, поэтому ищем через автокомплит админки
+        widget=AutocompleteSelectMultiple(Filmwork._meta.get_field('persons'), admin.site),
+    )
+
+
+class BulkCreditsForm(BulkPersonsForm):
+    role = forms.CharField(label=_('role'), max_length=255)
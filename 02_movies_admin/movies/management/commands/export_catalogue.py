@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from movies.export import CHUNK_SIZE, FORMATS, iter_export
+from movies.models import Filmwork
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает фильмы с жанрами и участниками в CSV или JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='jsonl')
+        parser.add_argument('--output', help='файл для выгрузки, по умолчанию stdout')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = Filmwork.objects.order_by('title', 'id')
+        chunks = iter_export(queryset, options['format'], options['chunk_size'])
+
+        # Вся выгрузка в одной транзакции: серверный курсор без WITH HOLD
+        with transaction.atomic(using=queryset.db):
+            if options['output']:
+                with open(options['output'], 'w', encoding='utf-8', newline='') as file:
+                    file.writelines(chunks)
+            else:
+                for chunk in chunks:
+                    self.stdout.write(chunk, ending='')
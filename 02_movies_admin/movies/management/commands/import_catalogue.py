@@ -0,0 +1,266 @@
+import csv
+import io
+import json
+import os
+import re
+from collections import namedtuple
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from movies.cache import genre_catalogue
+from movies.models import (Filmwork, Genre, GenreFilmwork, Person,
+                           PersonFilmwork)
+
+Source = namedtuple('Source', ('option', 'model', 'fields', 'conflict', 'references'))
+
+# Порядок важен: связи сливаются после фильмов, жанров и персон
+SOURCES = (
+    Source('genres', Genre, ('id', 'name', 'description'), ('id',), ()),
+    Source('persons', Person, ('id', 'full_name'), ('id',), ()),
+    Source('films', Filmwork,
+           ('id', 'title', 'description', 'creation_date', 'rating', 'type'), ('id',), ()),
+    Source('genre_links', GenreFilmwork,
+           ('id', 'film_work', 'genre'), ('film_work', 'genre'), ('film_work', 'genre')),
+    Source('person_links', PersonFilmwork,
+           ('id', 'film_work', 'person', 'role'), ('film_work', 'person'), ('film_work', 'person')),
+)
+
+# Начало литерала, числа или \uXXXX, которое может продолжиться в следующем чанке
+TOKEN_PREFIX = re.compile(r'[\w.+-]*')
+
+
+def iter_json(file, chunk_size=64 * 1024):
+    """Читает объекты из JSON Lines или из JSON-массива, не загружая файл целиком.
+
+    Невалидный JSON — ValueError со смещением в символах от начала файла.
+    """
+    decoder = json.JSONDecoder()
+    buffer = chunk = file.read(chunk_size)
+    while chunk and buffer.isspace():
+        chunk = file.read(chunk_size)
+        buffer += chunk
+    offset = 0  # символов файла перед buffer
+    in_array = buffer.lstrip().startswith('[')
+    if in_array:
+        offset = buffer.index('[') + 1
+        buffer = buffer[offset:]
+
+    while True:
+        stripped = buffer.lstrip().lstrip(',').lstrip()
+        offset += len(buffer) - len(stripped)
+        buffer = stripped
+        if in_array and buffer.startswith(']'):
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as error:
+            # Дочитываем, только если значение могло оборваться на конце буфера: строка
+            # без закрывающей кавычки или ошибка в недописанном токене в конце буфера.
+            # Иначе ошибка в середине файла потянула бы в память весь остаток.
+            truncated = (error.msg.startswith('Unterminated string')
+                         or TOKEN_PREFIX.fullmatch(buffer, error.pos))
+            chunk = file.read(chunk_size) if truncated else ''
+            if not chunk:
+                if buffer:
+                    raise ValueError(f'invalid JSON at offset {offset + error.pos}: {error.msg}')
+                return
+            buffer += chunk
+            continue
+        if TOKEN_PREFIX.fullmatch(buffer, end):
+            # Число или литерал на границе чанка могли прочитаться не целиком: 1. или 1e
+            # декодируются как 1
+            chunk = file.read(chunk_size)
+            if chunk:
+                buffer += chunk
+                continue
+        yield obj
+        buffer = buffer[end:]
+        offset += end
+
+
+def iter_rows(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        if os.path.splitext(path)[1].lower() == '.csv':
+            yield from csv.DictReader(file)
+        else:
+            yield from iter_json(file)
+
+
+def copy_value(value):
+    """Значение в текстовом формате COPY."""
+    if value is None:
+        return r'\N'
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+
+class Command(BaseCommand):
+    help = 'Потоково загружает каталог из CSV/JSON через COPY во временные таблицы и сливает его'
+
+    def add_arguments(self, parser):
+        for source in SOURCES:
+            parser.add_argument(f'--{source.option.replace("_", "-")}', dest=source.option,
+                                help=f'CSV, JSON или JSON Lines файл ({", ".join(source.fields)})')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--strict', action='store_true',
+                            help='прервать загрузку на первой невалидной строке')
+
+    def handle(self, *args, **options):
+        sources = [source for source in SOURCES if options[source.option]]
+        if not sources:
+            raise CommandError('Укажите хотя бы один файл для загрузки')
+
+        # Временные таблицы живут до конца транзакции, слияние атомарно
+        with transaction.atomic(), connection.cursor() as cursor:
+            for source in sources:
+                staging = self.create_staging(cursor, source)
+                self.stage(cursor, source, staging, options[source.option], options)
+                if source.references:
+                    self.drop_conflicting_ids(cursor, source, staging)
+                self.merge(cursor, source, staging)
+                if source.model is Genre:
+                    # Жанры сливаются SQL-запросом, сигналы модели не срабатывают
+                    transaction.on_commit(genre_catalogue.invalidate)
+
+    @staticmethod
+    def columns(source):
+        return [source.model._meta.get_field(name).column for name in source.fields]
+
+    def create_staging(self, cursor, source):
+        staging = 'import_' + source.model._meta.db_table.split('"."')[-1]
+        definition = ', '.join(
+            '{} {}'.format(field.column, field.db_type(connection))
+            for field in map(source.model._meta.get_field, source.fields)
+        )
+        cursor.execute(f'CREATE TEMPORARY TABLE {staging} '
+                       f'(seq bigserial, {definition}) ON COMMIT DROP')
+        return staging
+
+    def clean_row(self, source, row):
+        if not isinstance(row, dict):
+            raise ValidationError(f'ожидался объект, а не {type(row).__name__}')
+        instance = source.model()
+        for name in source.fields:
+            field = source.model._meta.get_field(name)
+            value = row.get(name, row.get(field.attname))
+            if value in ('', None):
+                if name == 'id':
+                    continue  # останется uuid4 из default
+                value = None
+            setattr(instance, field.attname, value)
+
+        # Внешние ключи проверяются целиком при слиянии, а не запросом на каждую строку
+        for name in source.references:
+            field = source.model._meta.get_field(name)
+            value = field.to_python(getattr(instance, field.attname))
+            if value is None:
+                raise ValidationError({name: field.error_messages['null']})
+            setattr(instance, field.attname, value)
+        instance.full_clean(exclude=source.references, validate_unique=False)
+
+        return [getattr(instance, source.model._meta.get_field(name).attname)
+                for name in source.fields]
+
+    def stage(self, cursor, source, staging, path, options):
+        rows = enumerate(iter_rows(path), start=1)
+        copy_sql = 'COPY {} ({}) FROM STDIN'.format(staging, ', '.join(self.columns(source)))
+        staged = invalid = 0
+
+        while True:
+            try:
+                batch = list(islice(rows, options['batch_size']))
+            except ValueError as error:
+                raise CommandError(f'{path}: {error}')
+            if not batch:
+                break
+
+            buffer = io.StringIO()
+            for line, row in batch:
+                try:
+                    values = self.clean_row(source, row)
+                except ValidationError as error:
+                    if options['strict']:
+                        raise CommandError(f'{path}:{line}: {error}')
+                    self.stderr.write(f'{path}:{line}: {error}')
+                    invalid += 1
+                    continue
+                buffer.write('\t'.join(map(copy_value, values)) + '\n')
+                staged += 1
+
+            if buffer.tell():
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+            self.stdout.write(f'{source.option}: {staged} rows staged, {invalid} invalid')
+
+    def drop_conflicting_ids(self, cursor, source, staging):
+        """Отбрасывает связи, чей id уже занят другой парой в таблице или в самом файле.
+
+        ON CONFLICT разрешает конфликт только по паре (фильм, жанр/персона), а такой id
+        нарушил бы первичный ключ и откатил бы всю загрузку.
+        """
+        pair = [source.model._meta.get_field(name).column for name in source.references]
+        cursor.execute("""
+            DELETE FROM {staging} s
+            WHERE s.id IN (SELECT id FROM {staging} GROUP BY id
+                           HAVING count(DISTINCT ({pair})) > 1)
+               OR EXISTS (SELECT 1 FROM {table} t
+                          WHERE t.id = s.id AND ({table_pair}) <> ({staged_pair}))
+        """.format(
+            staging=staging,
+            table=connection.ops.quote_name(source.model._meta.db_table),
+            pair=', '.join(pair),
+            table_pair=', '.join(f't.{column}' for column in pair),
+            staged_pair=', '.join(f's.{column}' for column in pair),
+        ))
+        if cursor.rowcount:
+            self.stderr.write(f'{source.option}: {cursor.rowcount} rows dropped, '
+                              f'id belongs to another link')
+
+    def merge(self, cursor, source, staging):
+        model = source.model
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = self.columns(source)
+        conflict = [model._meta.get_field(name).column for name in source.conflict]
+        timestamps = [field.column for field in model._meta.concrete_fields
+                      if field.name in ('created', 'modified')]
+
+        # Последняя версия строки с тем же ключом побеждает
+        select = 'SELECT DISTINCT ON ({conflict}) {columns}, {now} FROM {staging} s'.format(
+            conflict=', '.join(f's.{column}' for column in conflict),
+            columns=', '.join(f's.{column}' for column in columns),
+            now=', '.join('now()' for _ in timestamps),
+            staging=staging,
+        )
+        # Связи без существующего фильма, жанра или персоны отбрасываются
+        for name in source.references:
+            field = model._meta.get_field(name)
+            select += ' JOIN {} ON {}.id = s.{}'.format(
+                connection.ops.quote_name(field.related_model._meta.db_table),
+                connection.ops.quote_name(field.related_model._meta.db_table),
+                field.column,
+            )
+        select += ' ORDER BY {}, s.seq DESC'.format(', '.join(f's.{column}' for column in conflict))
+
+        updates = [column for column in columns if column not in conflict and column != 'id']
+        if 'modified' in timestamps:
+            updates.append('modified')
+        if updates:
+            on_conflict = 'DO UPDATE SET ' + ', '.join(f'{column} = EXCLUDED.{column}'
+                                                       for column in updates)
+        else:
+            on_conflict = 'DO NOTHING'
+
+        cursor.execute('INSERT INTO {table} ({columns}) {select} ON CONFLICT ({conflict}) {action}'
+                       .format(
+                           table=table,
+                           columns=', '.join(columns + timestamps),
+                           select=select,
+                           conflict=', '.join(conflict),
+                           action=on_conflict,
+                       ))
+        self.stdout.write(self.style.SUCCESS(f'{source.option}: {cursor.rowcount} rows merged'))
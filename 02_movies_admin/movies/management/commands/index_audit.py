@@ -0,0 +1,241 @@
+from collections import namedtuple
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+IndexInfo = namedtuple('IndexInfo', ('table', 'name', 'columns', 'unique', 'primary',
+                                     'constraint', 'scans', 'size'))
+ForeignKeyInfo = namedtuple('ForeignKeyInfo', ('table', 'name', 'columns', 'target'))
+
+# Секционированный индекс сам не сканируется и места не занимает: статистика и размер
+# берутся с индексов его секций (один уровень, как создаёт movies.0002)
+INDEXES_SQL = """
+    SELECT c.relname, i.relname,
+           array_agg(a.attname ORDER BY k.ord),
+           x.indisunique, x.indisprimary, con.conname,
+           coalesce(s.idx_scan, (SELECT sum(ps.idx_scan) FROM pg_inherits h
+                                 JOIN pg_stat_user_indexes ps ON ps.indexrelid = h.inhrelid
+                                 WHERE h.inhparent = i.oid), 0),
+           pg_relation_size(i.oid) + coalesce((SELECT sum(pg_relation_size(h.inhrelid))
+                                               FROM pg_inherits h WHERE h.inhparent = i.oid), 0)
+    FROM pg_index x
+    JOIN pg_class i ON i.oid = x.indexrelid
+    JOIN pg_class c ON c.oid = x.indrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_am am ON am.oid = i.relam
+    CROSS JOIN LATERAL unnest(x.indkey::smallint[]) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = k.attnum
+    LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = i.oid
+    LEFT JOIN pg_constraint con ON con.conindid = i.oid AND con.contype IN ('p', 'u', 'x')
+    WHERE n.nspname = %s AND NOT c.relispartition AND am.amname = 'btree'
+      AND x.indexprs IS NULL AND x.indpred IS NULL AND k.ord <= x.indnkeyatts
+    GROUP BY c.relname, i.relname, i.oid, x.indisunique, x.indisprimary, con.conname, s.idx_scan
+    ORDER BY c.relname, i.relname
+"""
+
+FOREIGN_KEYS_SQL = """
+    SELECT c.relname, con.conname, array_agg(a.attname ORDER BY k.ord), f.relname
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_class f ON f.oid = con.confrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    CROSS JOIN LATERAL unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = k.attnum
+    WHERE con.contype = 'f' AND n.nspname = %s AND NOT c.relispartition
+    GROUP BY c.relname, con.conname, f.relname
+    ORDER BY c.relname, con.conname
+"""
+
+
+def table_name(model):
+    # db_table вида content"."film_work: схема задана прямо в имени таблицы
+    return model._meta.db_table.split('"."')[-1]
+
+
+def model_indexes(model):
+    """Индексы, которые Django создаёт для модели: первичный ключ, db_index/unique полей,
+    Meta.indexes и уникальные ограничения. Частичные индексы не учитываются."""
+    meta = model._meta
+    table = table_name(model)
+    columns = {field.name: field.column for field in meta.local_fields}
+    indexes = []
+
+    for field in meta.local_fields:
+        if field.primary_key:
+            indexes.append(IndexInfo(table, 'pk', (field.column,), True, True, 'pk', None, None))
+        elif field.unique:
+            indexes.append(IndexInfo(table, f'{field.name}.unique', (field.column,),
+                                     True, False, f'{field.name}.unique', None, None))
+        elif field.db_index:
+            indexes.append(IndexInfo(table, f'{field.name}.db_index', (field.column,),
+                                     False, False, None, None, None))
+
+    for index in meta.indexes:
+        if index.fields and not index.condition:
+            fields = [name.lstrip('-') for name in index.fields]
+            indexes.append(IndexInfo(table, index.name, tuple(columns[name] for name in fields),
+                                     False, False, None, None, None))
+
+    for constraint in meta.constraints:
+        if getattr(constraint, 'fields', None) and not getattr(constraint, 'condition', None):
+            indexes.append(IndexInfo(table, constraint.name,
+                                     tuple(columns[name] for name in constraint.fields),
+                                     True, False, constraint.name, None, None))
+
+    for fields in meta.unique_together:
+        indexes.append(IndexInfo(table, 'unique_together', tuple(columns[name] for name in fields),
+                                 True, False, 'unique_together', None, None))
+    for fields in meta.index_together:
+        indexes.append(IndexInfo(table, 'index_together', tuple(columns[name] for name in fields),
+                                 False, False, None, None, None))
+    return indexes
+
+
+def model_foreign_keys(model):
+    return [
+        ForeignKeyInfo(table_name(model), field.name, (field.column,),
+                       table_name(field.related_model))
+        for field in model._meta.local_fields
+        if field.remote_field and field.db_constraint
+    ]
+
+
+def find_duplicates(indexes):
+    """Пары (лишний, покрывающий): лишний индекс совпадает с другим или является его
+    префиксом. Уникальный индекс лишний, только если другой уникален по тем же столбцам."""
+    duplicates = []
+    for index in indexes:
+        if index.primary:
+            continue
+        for other in indexes:
+            if other is index or other.table != index.table:
+                continue
+            if other.columns[:len(index.columns)] != index.columns:
+                continue
+            if index.unique and not (other.unique and other.columns == index.columns):
+                continue
+            if other.columns == index.columns and other.unique == index.unique:
+                # Из двух одинаковых лишним считаем тот, что не держит ограничение,
+                # а при равенстве — второй по имени, чтобы не сообщать о паре дважды
+                if (bool(other.constraint), index.name) < (bool(index.constraint), other.name):
+                    continue
+            duplicates.append((index, other))
+            break
+    return duplicates
+
+
+def find_missing_fk_indexes(foreign_keys, indexes):
+    """Внешние ключи без индекса, начинающегося с их столбцов: поиск по ним и
+    ON DELETE CASCADE со стороны связанной таблицы читают таблицу целиком."""
+    missing = []
+    for key in foreign_keys:
+        width = len(key.columns)
+        if not any(index.table == key.table and
+                   set(index.columns[:width]) == set(key.columns) for index in indexes):
+            missing.append(key)
+    return missing
+
+
+def size_pretty(size):
+    for unit in ('B', 'kB', 'MB', 'GB'):
+        if size < 1024:
+            return f'{size:.0f} {unit}'
+        size /= 1024
+    return f'{size:.0f} TB'
+
+
+class Command(BaseCommand):
+    help = ('Ищет дублирующиеся, неиспользуемые индексы и внешние ключи без индекса '
+            'в описании моделей и в базе')
+
+    def add_arguments(self, parser):
+        parser.add_argument('app_labels', nargs='*', default=['movies'])
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--schema', default='content', help='схема с таблицами приложения')
+        parser.add_argument('--check', action='store_true',
+                            help='завершиться с ошибкой, если найдены проблемы')
+
+    def handle(self, *args, **options):
+        models = []
+        for label in options['app_labels']:
+            try:
+                models.extend(apps.get_app_config(label).get_models())
+            except LookupError as error:
+                raise CommandError(error)
+
+        findings = self.audit_models(models)
+
+        connection = connections[options['database']]
+        if connection.vendor == 'postgresql':
+            tables = {table_name(model) for model in models}
+            findings += self.audit_database(connection, options['schema'], tables, models)
+        else:
+            self.stdout.write(f'Проверка базы пропущена: {connection.vendor} не PostgreSQL')
+
+        if not findings:
+            self.stdout.write(self.style.SUCCESS('Проблем с индексами не найдено'))
+        elif options['check']:
+            raise CommandError(f'Найдено проблем с индексами: {findings}')
+
+    def audit_models(self, models):
+        indexes = [index for model in models for index in model_indexes(model)]
+        foreign_keys = [key for model in models for key in model_foreign_keys(model)]
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Модели:'))
+        duplicates = find_duplicates(indexes)
+        for index, other in duplicates:
+            self.warn(f'{index.table}.{index.name} ({", ".join(index.columns)}) '
+                      f'дублирует {other.name} ({", ".join(other.columns)})')
+        missing = find_missing_fk_indexes(foreign_keys, indexes)
+        for key in missing:
+            self.warn(f'{key.table}.{key.name} -> {key.target}: внешний ключ без индекса')
+        return len(duplicates) + len(missing)
+
+    def audit_database(self, connection, schema, tables, models):
+        with connection.cursor() as cursor:
+            cursor.execute(INDEXES_SQL, [schema])
+            indexes = [IndexInfo(table, name, tuple(columns), *rest)
+                       for table, name, columns, *rest in cursor.fetchall() if table in tables]
+            cursor.execute(FOREIGN_KEYS_SQL, [schema])
+            foreign_keys = [ForeignKeyInfo(table, name, tuple(columns), target)
+                            for table, name, columns, target in cursor.fetchall()
+                            if table in tables]
+            cursor.execute('SELECT stats_reset FROM pg_stat_database '
+                           'WHERE datname = current_database()')
+            stats_reset = cursor.fetchone()[0]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'База, схема {schema}:'))
+        duplicates = find_duplicates(indexes)
+        for index, other in duplicates:
+            drop = (f'ALTER TABLE {schema}.{index.table} DROP CONSTRAINT {index.constraint}'
+                    if index.constraint else f'DROP INDEX CONCURRENTLY {schema}.{index.name}')
+            self.warn(f'{index.table}.{index.name} ({", ".join(index.columns)}, '
+                      f'{size_pretty(index.size)}) дублирует {other.name}: {drop};')
+
+        missing = find_missing_fk_indexes(foreign_keys, indexes)
+        for key in missing:
+            self.warn(f'{key.table}.{key.name} -> {key.target}: внешний ключ без индекса: '
+                      f'CREATE INDEX CONCURRENTLY ON {schema}.{key.table} '
+                      f'({", ".join(key.columns)});')
+
+        redundant = {index.name for index, _ in duplicates}
+        unused = [index for index in indexes
+                  if not index.scans and not index.unique and index.name not in redundant]
+        for index in unused:
+            self.warn(f'{index.table}.{index.name} ({", ".join(index.columns)}, '
+                      f'{size_pretty(index.size)}) не использовался с {stats_reset or "запуска"}')
+
+        # Столбцы индексов из моделей, которых нет в базе: миграции не применены
+        # или схема создана не миграциями
+        existing = {(index.table, index.columns) for index in indexes}
+        # Первичный ключ не сравнивается: у секционированных таблиц он (id, film_work_id)
+        absent = [index for model in models for index in model_indexes(model)
+                  if not index.primary and (index.table, index.columns) not in existing]
+        for index in absent:
+            self.warn(f'{index.table}.{index.name} ({", ".join(index.columns)}) '
+                      f'описан в модели, но отсутствует в базе')
+        return len(duplicates) + len(missing) + len(unused) + len(absent)
+
+    def warn(self, message):
+        self.stdout.write(self.style.WARNING(f'  {message}'))
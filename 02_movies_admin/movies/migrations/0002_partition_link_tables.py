@@ -0,0 +1,94 @@
+"""Необязательное hash-секционирование таблиц связей по film_work_id.
+
+Включается переменной окружения MOVIES_LINK_TABLE_PARTITIONS (число секций, 0 — выключено)
+в момент применения миграции. Чтобы включить или выключить секционирование на уже
+развёрнутой базе, откатите миграции movies до 0001 и примените их заново с нужным
+значением переменной.
+
+Ключ секционирования обязан входить в первичный ключ, поэтому у секционированных таблиц
+первичный ключ (id, film_work_id). Уникальность (film_work_id, genre_id/person_id)
+сохраняется: ограничение уже содержит ключ секционирования. Состояние моделей Django
+не меняется.
+"""
+from django.conf import settings
+from django.db import migrations
+
+LINK_MODELS = ('GenreFilmwork', 'PersonFilmwork')
+
+
+def is_partitioned(schema_editor, model):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)',
+                       ['"{}"'.format(model._meta.db_table)])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def rebuild_table(schema_editor, model, partitions):
+    """Пересоздаёт таблицу связей с секциями или без, перенося данные, индексы и ограничения."""
+    quote = schema_editor.quote_name
+    schema, name = model._meta.db_table.split('"."')
+    table = quote(model._meta.db_table)
+    new_name = f'{name}_rebuilt'
+    new_table = f'{quote(schema)}.{quote(new_name)}'
+
+    if partitions:
+        schema_editor.execute(f'CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS) '
+                              f'PARTITION BY HASH (film_work_id)')
+        for remainder in range(partitions):
+            schema_editor.execute(
+                f'CREATE TABLE {quote(schema)}.{quote(f"{name}_p{remainder}")} '
+                f'PARTITION OF {new_table} '
+                f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+            )
+    else:
+        schema_editor.execute(f'CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS)')
+
+    schema_editor.execute(f'INSERT INTO {new_table} SELECT * FROM {table}')
+    # Вместе с секционированной таблицей удаляются и её секции
+    schema_editor.execute(f'DROP TABLE {table}')
+    schema_editor.execute(f'ALTER TABLE {new_table} RENAME TO {quote(name)}')
+
+    primary_key = '(id, film_work_id)' if partitions else '(id)'
+    schema_editor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY {primary_key}')
+
+    # Внешние ключи, индексы и ограничения — с теми же именами, что создаёт Django
+    for field in model._meta.local_fields:
+        if field.remote_field and field.db_constraint:
+            schema_editor.execute(
+                schema_editor._create_fk_sql(model, field, '_fk_%(to_table)s_%(to_column)s')
+            )
+    for sql in schema_editor._model_indexes_sql(model):
+        schema_editor.execute(sql)
+    for constraint in model._meta.constraints:
+        schema_editor.add_constraint(model, constraint)
+
+
+def partition_link_tables(apps, schema_editor):
+    partitions = settings.MOVIES_LINK_TABLE_PARTITIONS
+    if not partitions or schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in LINK_MODELS:
+        model = apps.get_model('movies', model_name)
+        if not is_partitioned(schema_editor, model):
+            rebuild_table(schema_editor, model, partitions)
+
+
+def unpartition_link_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in LINK_MODELS:
+        model = apps.get_model('movies', model_name)
+        if is_partitioned(schema_editor, model):
+            rebuild_table(schema_editor, model, 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_link_tables, unpartition_link_tables),
+    ]
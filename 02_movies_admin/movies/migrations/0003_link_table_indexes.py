@@ -0,0 +1,86 @@
+# Generated by Django 3.2 on 2026-10-19 13:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+LINK_MODELS = ('GenreFilmwork', 'PersonFilmwork')
+
+# Одностолбцовые неуникальные индексы по film_work_id таблицы (не секции)
+FILM_WORK_INDEXES_SQL = """
+    SELECT i.relname
+    FROM pg_index x
+    JOIN pg_class i ON i.oid = x.indexrelid
+    JOIN pg_class c ON c.oid = x.indrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = x.indkey[0]
+    WHERE n.nspname = %s AND c.relname = %s AND x.indnatts = 1 AND NOT x.indisunique
+      AND a.attname = 'film_work_id'
+"""
+
+
+def drop_film_work_indexes(apps, schema_editor):
+    # AlterField(db_index=False) индекс в базе не удаляет: Django ищет его через
+    # get_constraints() по имени таблицы вместе со схемой и ничего не находит
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    for model_name in LINK_MODELS:
+        schema, table = apps.get_model('movies', model_name)._meta.db_table.split('"."')
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(FILM_WORK_INDEXES_SQL, [schema, table])
+            names = [row[0] for row in cursor.fetchall()]
+        for name in names:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {quote(schema)}.{quote(name)}')
+
+
+def create_film_work_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in LINK_MODELS:
+        db_table = apps.get_model('movies', model_name)._meta.db_table
+        name = schema_editor._create_index_name(db_table, ['film_work_id'])
+        schema_editor.execute('CREATE INDEX IF NOT EXISTS {} ON {} (film_work_id)'.format(
+            schema_editor.quote_name(name), schema_editor.quote_name(db_table),
+        ))
+
+
+class Migration(migrations.Migration):
+    """Убирает индексы таблиц связей, дублирующие уникальные ограничения.
+
+    film_work_genre_idx и film_work_person_idx совпадают с индексами ограничений
+    film_work_genre_unq и film_work_person_unq, а отдельный индекс по film_work_id
+    является их префиксом. Индексы по genre_id и person_id, нужные для выборки
+    фильмов жанра или персоны и каскадного удаления, остаются.
+    """
+
+    dependencies = [
+        ('movies', '0002_partition_link_tables'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='genrefilmwork',
+            name='film_work_genre_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='personfilmwork',
+            name='film_work_person_idx',
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='genrefilmwork',
+                    name='film_work',
+                    field=models.ForeignKey(db_column='film_work_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='movies.filmwork', verbose_name='film_work'),
+                ),
+                migrations.AlterField(
+                    model_name='personfilmwork',
+                    name='film_work',
+                    field=models.ForeignKey(db_column='film_work_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='movies.filmwork', verbose_name='film_work'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(drop_film_work_indexes, create_film_work_indexes),
+            ],
+        ),
+    ]
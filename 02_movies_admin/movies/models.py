@@ -1,9 +1,14 @@
 import uuid
 
+from django.contrib.postgres.aggregates import ArrayAgg, JSONBAgg
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import JSONObject
 from django.utils.translation import gettext_lazy as _
 
+from .cache import genre_catalogue
+
 
 class TimeStampedMixin(models.Model):
     # auto_now_add автоматически выставит дату создания записи
@@ -42,11 +47,30 @@ class Genre(UUIDMixin, TimeStampedMixin):
         verbose_name_plural = _('genres')
 
 
+class PersonQuerySet(models.QuerySet):
+
+    def with_films(self):
+        """Добавляет фильмы персоны массивом пар {id, role}, как FilmworkQuerySet.with_credits.
+
+        Пары собираются одним агрегатом: в двух отдельных массивах фильм и роль
+        в нём нельзя было бы сопоставить.
+        """
+        films = (PersonFilmwork.objects
+                 .filter(person=OuterRef('pk'))
+                 .values('person')
+                 .annotate(films=JSONBAgg(JSONObject(id='film_work', role='role'),
+                                          ordering='film_work'))
+                 .values('films'))
+        return self.annotate(films=Subquery(films))
+
+
 class Person(UUIDMixin, TimeStampedMixin):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     full_name = models.TextField(_('full_name'), max_length=255)
 
+    objects = PersonQuerySet.as_manager()
+
     def __str__(self):
         return self.full_name
 
@@ -60,6 +84,32 @@ class Person(UUIDMixin, TimeStampedMixin):
         ]
 
 
+class FilmworkQuerySet(models.QuerySet):
+
+    def with_credits(self):
+        """Добавляет жанры и участников фильма массивами, собранными на стороне Postgres.
+
+        Каждый массив считается коррелированным подзапросом, поэтому количество запросов
+        не зависит от размера выборки, а соединения жанров и персон не перемножаются.
+        """
+        genres = (GenreFilmwork.objects
+                  .filter(film_work=OuterRef('pk'))
+                  .values('film_work')
+                  .annotate(names=ArrayAgg('genre__name', ordering='genre__name'))
+                  .values('names'))
+        annotations = {'genre_names': Subquery(genres)}
+
+        for alias, role in (('actors', 'actor'), ('directors', 'director'), ('writers', 'writer')):
+            persons = (PersonFilmwork.objects
+                       .filter(film_work=OuterRef('pk'), role=role)
+                       .values('film_work')
+                       .annotate(names=ArrayAgg('person__full_name', ordering='person__full_name'))
+                       .values('names'))
+            annotations[alias] = Subquery(persons)
+
+        return self.annotate(**annotations)
+
+
 class Filmwork(UUIDMixin, TimeStampedMixin):
 
     class Type(models.TextChoices):
@@ -80,6 +130,8 @@ class Filmwork(UUIDMixin, TimeStampedMixin):
     genres = models.ManyToManyField(Genre, verbose_name=_('genres'), through='GenreFilmwork')
     persons = models.ManyToManyField(Person, through='PersonFilmwork')
 
+    objects = FilmworkQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
@@ -97,9 +149,11 @@ class Filmwork(UUIDMixin, TimeStampedMixin):
 
 
 class GenreFilmwork(UUIDMixin):
+    # Поиск по film_work_id обслуживает индекс уникального ограничения (film_work_id, ...)
     film_work = models.ForeignKey('Filmwork',
                                   verbose_name=_('film_work'),
                                   db_column='film_work_id',
+                                  db_index=False,
                                   on_delete=models.CASCADE)
 
     genre = models.ForeignKey('Genre',
@@ -109,6 +163,10 @@ class GenreFilmwork(UUIDMixin):
 
     created = models.DateTimeField(auto_now_add=True)
 
+    def __str__(self):
+        # Имя берётся из справочника, без отдельного запроса за жанром
+        return genre_catalogue.get_name(self.genre_id) or str(self.genre_id)
+
     class Meta:
         db_table = "content\".\"genre_film_work"
         verbose_name = _('genre_film_work')
@@ -117,15 +175,14 @@ class GenreFilmwork(UUIDMixin):
         constraints = [
             models.UniqueConstraint(fields=['film_work', 'genre'], name='film_work_genre_unq')
         ]
-        indexes = [
-            models.Index(fields=['film_work', 'genre'], name='film_work_genre_idx'),
-        ]
 
 
 class PersonFilmwork(UUIDMixin):
+    # Поиск по film_work_id обслуживает индекс уникального ограничения (film_work_id, ...)
     film_work = models.ForeignKey('Filmwork',
                                   verbose_name=_('film_work'),
                                   db_column='film_work_id',
+                                  db_index=False,
                                   on_delete=models.CASCADE)
 
     person = models.ForeignKey('Person',
@@ -144,6 +201,3 @@ class PersonFilmwork(UUIDMixin):
         constraints = [
             models.UniqueConstraint(fields=['film_work', 'person'], name='film_work_person_unq')
         ]
-        indexes = [
-            models.Index(fields=['film_work', 'person'], name='film_work_person_idx'),
-        ]
@@ -0,0 +1,37 @@
+import base64
+import json
+import uuid
+
+from django.db.models import Q
+
+
+def encode_cursor(value, pk):
+    """Курсор keyset-пагинации: значение ключа сортировки и id последней строки."""
+    raw = json.dumps([value, str(pk)], ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        item = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        # Ключи сортировки (title, full_name) — строки; остальное до SQL не допускаем
+        if not (isinstance(item, list) and len(item) == 2 and
+                all(isinstance(part, str) for part in item)):
+            raise ValueError
+        value, pk = item
+        return value, uuid.UUID(pk)
+    except (TypeError, ValueError):
+        raise ValueError('invalid cursor')
+
+
+def seek(field, value, pk, backwards=False):
+    """Условие «строго после (value, pk)» при сортировке по (field, id).
+
+    field >= value вынесено из OR отдельным условием: Postgres берёт его границей
+    диапазона в индексе по field и начинает сканирование сразу с нужного места.
+    Верхний уровень OR индексного условия не даёт, и тогда индекс читается с начала,
+    как при OFFSET. Лишними читаются только строки с тем же значением field.
+    """
+    op = 'lt' if backwards else 'gt'
+    return Q(**{f'{field}__{op}e': value}) & (Q(**{f'{field}__{op}': value}) |
+                                              Q(**{f'pk__{op}': pk}))
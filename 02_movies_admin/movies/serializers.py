@@ -0,0 +1,28 @@
+FILM_FIELDS = ('id', 'title', 'description', 'creation_date', 'rating', 'type')
+CREDIT_FIELDS = ('genre_names', 'actors', 'directors', 'writers')
+ROLE_FIELDS = ('actors', 'directors', 'writers')
+PERSON_FIELDS = ('id', 'full_name')
+
+
+def film_values(queryset):
+    """Строки фильмов вместе с жанрами и участниками, см. FilmworkQuerySet.with_credits."""
+    return queryset.with_credits().values(*FILM_FIELDS, *CREDIT_FIELDS)
+
+
+def serialize_film(row):
+    film = {field: row[field] for field in FILM_FIELDS}
+    film['genres'] = row['genre_names'] or []
+    for role in ROLE_FIELDS:
+        film[role] = row[role] or []
+    return film
+
+
+def person_values(queryset):
+    """Строки персон вместе с их фильмами и ролями в них, см. PersonQuerySet.with_films."""
+    return queryset.with_films().values(*PERSON_FIELDS, 'films')
+
+
+def serialize_person(row):
+    person = {field: row[field] for field in PERSON_FIELDS}
+    person['films'] = row['films'] or []
+    return person
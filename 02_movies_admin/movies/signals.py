@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import genre_catalogue
+from .models import Genre
+
+
+@receiver([post_save, post_delete], sender=Genre)
+def invalidate_genre_catalogue(sender, **kwargs):
+    # Сбрасываем после коммита, иначе другой запрос успеет закэшировать незакоммиченные данные
+    transaction.on_commit(genre_catalogue.invalidate)
@@ -15,3 +15,12 @@ dsn = {
 
 #  sqlite
 db_path = 'db.sqlite'
+
+# Режим чтения, оптимизированный для больших файлов: файл открывается только на чтение
+# как неизменяемый (immutable=1 — пока идёт загрузка, в него никто не должен писать),
+# с отображением в память и увеличенным кэшем страниц
+sqlite_read_only = os.environ.get('SQLITE_READ_ONLY', 'false').lower() in ('1', 'true', 'yes')
+sqlite_mmap_size = int(os.environ.get('SQLITE_MMAP_SIZE', 1 << 30))  # байт
+sqlite_cache_size = int(os.environ.get('SQLITE_CACHE_SIZE', 64 * 1024))  # КиБ
+# Число соединений, параллельно читающих таблицы SQLite (1 — последовательное чтение)
+sqlite_readers = int(os.environ.get('SQLITE_READERS', 1))
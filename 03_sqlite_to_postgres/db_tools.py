@@ -1,3 +1,7 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from dc_models import Filmwork, Genre, GenreFilmwork, Person, PersonFilmwork
 from psycopg2.extras import execute_batch
 
@@ -12,69 +16,133 @@ class SQLiteLoader:
     GENRE_FILM_WORK_LOADING = False
     PERSON_FILM_WORK_LOADING = False
 
+    # Сначала основные таблицы, затем зависимые от них
+    LOAD_METHODS = (
+        'load_film_work',
+        'load_person',
+        'load_genre',
+        'load_genre_film_work',
+        'load_person_film_work',
+    )
+
     def __init__(self, conn):
         self.conn = conn
         self.curs = self.conn.cursor()
 
     def load_film_work(self):
         table = 'film_work'
-        query = f"SELECT title, description, creation_date, type, id, rating FROM {table};"
+        # Строки читаются в порядке первичного ключа: вставки в индекс id в Postgres
+        # идут подряд, а не в случайные страницы
+        query = (f"SELECT title, description, creation_date, type, id, rating "
+                 f"FROM {table} ORDER BY id;")
 
         # чтобы курсор переходил к другой пачке при повторном вызове метода
-        if not SQLiteLoader.FILM_WORK_LOADING:
+        if not self.FILM_WORK_LOADING:
             self.curs.execute(query)
-            SQLiteLoader.FILM_WORK_LOADING = True
+            self.FILM_WORK_LOADING = True
 
         return {table: [Filmwork(*row) for row in self.curs.fetchmany(SQLiteLoader.SIZE)]}
 
     def load_person(self):
         table = 'person'
-        query = f"SELECT full_name, id FROM {table};"
+        query = f"SELECT full_name, id FROM {table} ORDER BY id;"
 
-        if not SQLiteLoader.PERSON_LOADING:
+        if not self.PERSON_LOADING:
             self.curs.execute(query)
-            SQLiteLoader.PERSON_LOADING = True
+            self.PERSON_LOADING = True
 
         return {table: [Person(*row) for row in self.curs.fetchmany(SQLiteLoader.SIZE)]}
 
     def load_genre(self):
         table = 'genre'
-        query = f"SELECT name, description, id FROM {table};"
+        query = f"SELECT name, description, id FROM {table} ORDER BY id;"
 
-        if not SQLiteLoader.GENRE_LOADING:
+        if not self.GENRE_LOADING:
             self.curs.execute(query)
-            SQLiteLoader.GENRE_LOADING = True
+            self.GENRE_LOADING = True
 
         return {table: [Genre(*row) for row in self.curs.fetchmany(SQLiteLoader.SIZE)]}
 
     def load_genre_film_work(self):
         table = 'genre_film_work'
-        query = f"SELECT film_work_id, genre_id, id FROM {table};"
+        query = f"SELECT film_work_id, genre_id, id FROM {table} ORDER BY id;"
 
-        if not SQLiteLoader.GENRE_FILM_WORK_LOADING:
+        if not self.GENRE_FILM_WORK_LOADING:
             self.curs.execute(query)
-            SQLiteLoader.GENRE_FILM_WORK_LOADING = True
+            self.GENRE_FILM_WORK_LOADING = True
 
         return {table: [GenreFilmwork(*row) for row in self.curs.fetchmany(SQLiteLoader.SIZE)]}
 
     def load_person_film_work(self):
         table = 'person_film_work'
-        query = f"SELECT role, film_work_id, person_id, id FROM {table};"
+        query = f"SELECT role, film_work_id, person_id, id FROM {table} ORDER BY id;"
 
-        if not SQLiteLoader.PERSON_FILM_WORK_LOADING:
+        if not self.PERSON_FILM_WORK_LOADING:
             self.curs.execute(query)
-            SQLiteLoader.PERSON_FILM_WORK_LOADING = True
+            self.PERSON_FILM_WORK_LOADING = True
 
         return {table: [PersonFilmwork(*row) for row in self.curs.fetchmany(SQLiteLoader.SIZE)]}
 
     def get_load_methods(self):
-        return [
-            self.load_film_work,
-            self.load_person,
-            self.load_genre,
-            self.load_genre_film_work,
-            self.load_person_film_work
-        ]
+        return [getattr(self, name) for name in SQLiteLoader.LOAD_METHODS]
+
+
+class ConcurrentSQLiteLoader:
+    """Читает таблицы SQLite параллельно, каждую в своём соединении и потоке.
+
+    Пачки складываются в ограниченные очереди и отдаются в том же порядке таблиц,
+    что и у SQLiteLoader, поэтому зависимые таблицы по-прежнему пишутся последними,
+    а чтение следующих таблиц идёт, пока Postgres сохраняет текущую.
+    """
+
+    QUEUE_SIZE = 8  # пачек на таблицу
+
+    def __init__(self, connect, readers):
+        # connect() — контекстный менеджер, открывающий новое соединение с SQLite
+        self.connect = connect
+        self.readers = readers
+        self.stopped = threading.Event()
+
+    def read_table(self, method_name, batches):
+        try:
+            with self.connect() as conn:
+                load_method = getattr(SQLiteLoader(conn), method_name)
+                while not self.stopped.is_set():
+                    data = load_method()
+                    self.put(batches, data)
+                    if not any(data.values()):
+                        return
+        except Exception as error:
+            self.put(batches, error)
+
+    def put(self, batches, item):
+        # Если запись в Postgres упала, читатель не должен навсегда повиснуть на полной очереди
+        while not self.stopped.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get_batches(self):
+        queues = [queue.Queue(ConcurrentSQLiteLoader.QUEUE_SIZE) for _ in SQLiteLoader.LOAD_METHODS]
+
+        # Задачи стартуют в порядке таблиц, так что таблица, которую ждёт потребитель,
+        # всегда уже читается, даже если читателей меньше, чем таблиц
+        with ThreadPoolExecutor(max_workers=self.readers) as executor:
+            for method_name, batches in zip(SQLiteLoader.LOAD_METHODS, queues):
+                executor.submit(self.read_table, method_name, batches)
+            try:
+                for batches in queues:
+                    while True:
+                        data = batches.get()
+                        if isinstance(data, Exception):
+                            raise data
+                        if not any(data.values()):
+                            break
+                        yield data
+            finally:
+                self.stopped.set()
 
 
 class PostgresSaver:
@@ -1,21 +1,35 @@
 import os
 import sqlite3
 from contextlib import contextmanager
+from functools import partial
+from urllib.request import pathname2url
 
 import psycopg2
-from db_tools import PostgresSaver, SQLiteLoader
+from config import (db_path, dsn, sqlite_cache_size, sqlite_mmap_size,
+                    sqlite_read_only, sqlite_readers)
+from db_tools import ConcurrentSQLiteLoader, PostgresSaver, SQLiteLoader
 from dotenv import load_dotenv
 from psycopg2.extensions import connection as _connection
 from psycopg2.extras import execute_batch
-from config import dsn, db_path
 
 load_dotenv()
 
 @contextmanager
-def conn_context(db_path: str):
-    conn = sqlite3.connect(db_path)
-    yield conn
-    conn.close()
+def conn_context(db_path: str, read_only: bool = False,
+                 mmap_size: int = sqlite_mmap_size, cache_size: int = sqlite_cache_size):
+    if read_only:
+        # immutable=1: SQLite не берёт блокировки и не проверяет изменения файла
+        uri = f'file:{pathname2url(os.path.abspath(db_path))}?mode=ro&immutable=1'
+        conn = sqlite3.connect(uri, uri=True)
+        conn.execute(f'PRAGMA mmap_size = {int(mmap_size)}')
+        conn.execute(f'PRAGMA cache_size = -{int(cache_size)}')
+        conn.execute('PRAGMA query_only = ON')
+    else:
+        conn = sqlite3.connect(db_path)
+    try:
+        yield conn
+    finally:
+        conn.close()
 
 
 def load_from_sqlite(connection: sqlite3.Connection, pg_conn: _connection):
@@ -34,6 +48,18 @@ def load_from_sqlite(connection: sqlite3.Connection, pg_conn: _connection):
             postgres_saver.save_all_data(data)
 
 
+def load_from_sqlite_concurrently(connect, pg_conn: _connection, readers: int):
+    """Загрузка, при которой таблицы SQLite читаются параллельно в readers соединений"""
+    postgres_saver = PostgresSaver(pg_conn)
+    for data in ConcurrentSQLiteLoader(connect, readers).get_batches():
+        postgres_saver.save_all_data(data)
+
+
 if __name__ == '__main__':
-    with conn_context(db_path) as sqlite_conn, psycopg2.connect(**dsn) as pg_conn:
-        load_from_sqlite(sqlite_conn, pg_conn)
+    connect = partial(conn_context, db_path, read_only=sqlite_read_only)
+    with psycopg2.connect(**dsn) as pg_conn:
+        if sqlite_readers > 1:
+            load_from_sqlite_concurrently(connect, pg_conn, sqlite_readers)
+        else:
+            with connect() as sqlite_conn:
+                load_from_sqlite(sqlite_conn, pg_conn)
@@ -0,0 +1,121 @@
+"""Скорость чтения исходной базы SQLite в разных режимах загрузчика.
+
+Режимы: обычное соединение, соединение только для чтения (immutable, mmap_size,
+cache_size, query_only) и параллельное чтение таблиц в нескольких соединениях.
+Каждый режим читает все таблицы целиком теми же запросами, что и load_data.py,
+и выводит строки/с и МБ/с относительно размера файла.
+
+    python sqlite_read_bench.py big.sqlite --generate 3000000 --readers 5
+
+--generate создаёт файл с синтетическими данными (около 1 КБ на фильм, т. е. несколько
+гигабайт для миллионов фильмов), если его ещё нет. Первый проход прогревает page cache
+ОС, поэтому для «холодного» замера сбросьте кэш перед запуском.
+"""
+import argparse
+import os
+import sqlite3
+import time
+from functools import partial
+
+from db_tools import ConcurrentSQLiteLoader, SQLiteLoader
+from load_data import conn_context
+
+SCHEMA = """
+CREATE TABLE film_work (id TEXT PRIMARY KEY, title TEXT NOT NULL, description TEXT,
+                        creation_date DATE, file_path TEXT, rating FLOAT, type TEXT NOT NULL,
+                        created_at timestamp with time zone, updated_at timestamp with time zone);
+CREATE TABLE person (id TEXT PRIMARY KEY, full_name TEXT NOT NULL,
+                     created_at timestamp with time zone, updated_at timestamp with time zone);
+CREATE TABLE genre (id TEXT PRIMARY KEY, name TEXT NOT NULL, description TEXT,
+                    created_at timestamp with time zone, updated_at timestamp with time zone);
+CREATE TABLE genre_film_work (id TEXT PRIMARY KEY, film_work_id TEXT NOT NULL,
+                              genre_id TEXT NOT NULL, created_at timestamp with time zone);
+CREATE TABLE person_film_work (id TEXT PRIMARY KEY, film_work_id TEXT NOT NULL,
+                               person_id TEXT NOT NULL, role TEXT NOT NULL,
+                               created_at timestamp with time zone);
+"""
+
+# Случайный UUID в текстовом виде, как в исходной базе
+UUID = ("lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) "
+        "|| '-' || hex(randomblob(2)) || '-' || hex(randomblob(6)))")
+
+
+def generate(path, films):
+    persons, genres = max(films // 4, 1), 30
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.execute('PRAGMA journal_mode = OFF')
+    series = 'WITH RECURSIVE s(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM s WHERE n < ?) '
+    conn.execute(f"""{series}
+        INSERT INTO film_work (id, title, description, rating, type)
+        SELECT {UUID}, 'Film ' || n, hex(randomblob(480)), n % 100 / 10.0, 'movie' FROM s
+    """, [films - 1])
+    conn.execute(f"{series} INSERT INTO person (id, full_name) SELECT {UUID}, 'Person ' || n "
+                 f"FROM s", [persons - 1])
+    conn.execute(f"{series} INSERT INTO genre (id, name) SELECT {UUID}, 'Genre ' || n FROM s",
+                 [genres - 1])
+    # По одному жанру и по три участника на фильм
+    conn.execute(f"""
+        INSERT INTO genre_film_work (id, film_work_id, genre_id)
+        SELECT {UUID}, f.id, g.id FROM film_work f
+        JOIN genre g ON g.rowid = f.rowid % {genres} + 1
+    """)
+    for shift in range(3):
+        conn.execute(f"""
+            INSERT INTO person_film_work (id, film_work_id, person_id, role)
+            SELECT {UUID}, f.id, p.id, 'actor' FROM film_work f
+            JOIN person p ON p.rowid = (f.rowid + {shift}) % {persons} + 1
+        """)
+    conn.commit()
+    conn.close()
+
+
+def read_sequentially(connect):
+    rows = 0
+    with connect() as conn:
+        for load_method in SQLiteLoader(conn).get_load_methods():
+            while True:
+                data = load_method()
+                if not any(data.values()):
+                    break
+                rows += sum(map(len, data.values()))
+    return rows
+
+
+def read_concurrently(connect, readers):
+    loader = ConcurrentSQLiteLoader(connect, readers)
+    return sum(sum(map(len, data.values())) for data in loader.get_batches())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path')
+    parser.add_argument('--generate', type=int, metavar='FILMS',
+                        help='создать файл с указанным числом фильмов, если его нет')
+    parser.add_argument('--readers', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.generate and not os.path.exists(args.path):
+        generate(args.path, args.generate)
+    size_mb = os.path.getsize(args.path) / 2 ** 20
+    print(f'{args.path}: {size_mb:,.0f} MB')
+
+    modes = {
+        'plain': partial(read_sequentially, partial(conn_context, args.path)),
+        'read-only': partial(read_sequentially,
+                             partial(conn_context, args.path, read_only=True)),
+        f'read-only x{args.readers}': partial(read_concurrently,
+                                              partial(conn_context, args.path, read_only=True),
+                                              args.readers),
+    }
+    print(f'{"mode":<16}{"rows":>12}{"seconds":>10}{"rows/s":>12}{"MB/s":>10}')
+    for name, read in modes.items():
+        started = time.perf_counter()
+        rows = read()
+        elapsed = time.perf_counter() - started
+        print(f'{name:<16}{rows:>12,}{elapsed:>10.1f}{rows / elapsed:>12,.0f}'
+              f'{size_mb / elapsed:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
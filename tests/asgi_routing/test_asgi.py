@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from asgiref.testing import ApplicationCommunicator
+from config.asgi import application
+
+
+def request(path, method='GET'):
+    async def send():
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': b'',
+            'headers': [(b'host', b'127.0.0.1')],
+        })
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(5)
+        await communicator.receive_output(5)
+        return start['status']
+
+    return asyncio.run(send())
+
+
+@pytest.mark.parametrize('path', [
+    '/admin/',
+    '/admin/login/',
+    '/admin/metrics/',
+    '/api/v1/movies/',
+    '/api/v1/movies/586f933e-968d-4a75-a9de-b603d013527c/',
+])
+def test_wsgi_only_routes_are_not_found(path):
+    assert request(path) == 404
+
+
+@pytest.mark.parametrize('path', ['/api/v1/movies/batch/', '/api/v1/persons/batch/'])
+def test_batch_routes_are_served(path):
+    # GET отклоняется самим представлением, до обращения к базе
+    assert request(path) == 405
@@ -0,0 +1,45 @@
+"""Пути импорта для тестов обоих проектов.
+
+В 02_movies_admin config — пакет настроек Django, в 03_sqlite_to_postgres — модуль
+config.py, который импортирует load_data. Оба не могут быть модулем config в одном
+процессе, поэтому config.py из 03_sqlite_to_postgres загружается под своим именем
+и подставляется как config только на время импорта load_data.
+"""
+import importlib
+import importlib.util
+import os
+import sys
+
+import django
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MOVIES_ADMIN_DIR = os.path.join(TESTS_DIR, '../02_movies_admin')
+SQLITE_TO_POSTGRES_DIR = os.path.join(TESTS_DIR, '../03_sqlite_to_postgres')
+
+sys.path.insert(0, MOVIES_ADMIN_DIR)
+sys.path.append(SQLITE_TO_POSTGRES_DIR)
+
+
+def import_load_data():
+    spec = importlib.util.spec_from_file_location(
+        'sqlite_to_postgres_config', os.path.join(SQLITE_TO_POSTGRES_DIR, 'config.py'))
+    sqlite_config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(sqlite_config)
+    sys.modules[spec.name] = sqlite_config
+
+    movies_config = sys.modules.get('config')
+    sys.modules['config'] = sqlite_config
+    try:
+        importlib.import_module('load_data')
+    finally:
+        if movies_config is None:
+            del sys.modules['config']
+        else:
+            sys.modules['config'] = movies_config
+
+
+import_load_data()
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('SECRET_KEY', 'test')
+django.setup()
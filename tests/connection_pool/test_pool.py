@@ -0,0 +1,152 @@
+import threading
+from types import SimpleNamespace
+
+import psycopg2
+import pytest
+from config.db.postgresql.pool import ConnectionPool
+from psycopg2 import extensions
+
+
+class FakeConnection:
+    """Ровно то, что пул читает у соединения psycopg2."""
+
+    def __init__(self):
+        self.closed = 0
+        self.rollbacks = 0
+        self.info = SimpleNamespace(transaction_status=extensions.TRANSACTION_STATUS_IDLE)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeConnect:
+
+    def __init__(self):
+        self.connections = []
+
+    def __call__(self):
+        conn = FakeConnection()
+        self.connections.append(conn)
+        return conn
+
+
+def make_pool(**options):
+    connect = FakeConnect()
+    return ConnectionPool(connect, **options), connect
+
+
+def test_returned_connection_is_reused():
+    pool, connect = make_pool()
+
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    assert pool.getconn() is conn
+    assert len(connect.connections) == 1
+    stats = pool.stats()
+    assert stats['created'] == 1
+    assert stats['reused'] == 1
+    assert stats['in_use'] == 1
+
+
+def test_last_returned_connection_is_reused_first():
+    pool, _ = make_pool()
+    first, second = pool.getconn(), pool.getconn()
+
+    pool.putconn(first)
+    pool.putconn(second)
+
+    assert pool.getconn() is second
+
+
+def test_getconn_times_out_when_exhausted():
+    pool, _ = make_pool(max_size=1, timeout=0.05)
+    conn = pool.getconn()
+
+    with pytest.raises(psycopg2.OperationalError, match='exhausted'):
+        pool.getconn()
+    assert pool.stats()['timeouts'] == 1
+
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+
+
+def test_waiting_getconn_gets_released_connection():
+    pool, _ = make_pool(max_size=1, timeout=5)
+    conn = pool.getconn()
+    received = []
+
+    waiter = threading.Thread(target=lambda: received.append(pool.getconn()))
+    waiter.start()
+    pool.putconn(conn)
+    waiter.join(timeout=5)
+
+    assert received == [conn]
+
+
+def test_failed_connect_releases_slot():
+    pool, connect = make_pool(max_size=1, timeout=0.05)
+
+    def refuse():
+        raise psycopg2.OperationalError('refused')
+
+    pool.connect = refuse
+    with pytest.raises(psycopg2.OperationalError, match='refused'):
+        pool.getconn()
+
+    pool.connect = connect
+    assert pool.getconn() is connect.connections[0]
+
+
+def test_closed_idle_connection_is_discarded():
+    pool, connect = make_pool()
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.closed = 1  # сервер оборвал соединение, пока оно простаивало
+
+    fresh = pool.getconn()
+
+    assert fresh is not conn
+    assert len(connect.connections) == 2
+    assert pool.stats()['discarded'] == 1
+
+
+def test_connection_past_max_lifetime_is_discarded():
+    pool, _ = make_pool(max_lifetime=0)
+    conn = pool.getconn()
+
+    pool.putconn(conn)
+
+    assert conn.closed
+    stats = pool.stats()
+    assert stats['discarded'] == 1
+    assert stats['idle'] == 0
+
+
+def test_open_transaction_is_rolled_back_on_return():
+    pool, _ = make_pool()
+    conn = pool.getconn()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+
+    pool.putconn(conn)
+
+    assert conn.rollbacks == 1
+    assert pool.getconn() is conn
+
+
+def test_unhealthy_idle_connection_is_replaced():
+    pool, connect = make_pool(health_checks=True)
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    def broken_cursor():
+        raise psycopg2.InterfaceError('connection already closed')
+
+    conn.cursor = broken_cursor
+
+    assert pool.getconn() is connect.connections[1]
+    assert conn.closed
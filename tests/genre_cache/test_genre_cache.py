@@ -0,0 +1,156 @@
+import uuid
+
+import pytest
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.test import override_settings
+from movies import cache
+from movies.cache import GenreCatalogue, genre_catalogue
+from movies.models import Genre
+
+DRAMA, COMEDY = uuid.uuid4(), uuid.uuid4()
+
+
+class Loader:
+    """Подменяет запрос к базе и считает обращения."""
+
+    def __init__(self):
+        self.genres = {COMEDY: 'Comedy', DRAMA: 'Drama'}
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return dict(self.genres)
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def make_catalogue(monkeypatch, catalogue=None, loader=None):
+    catalogue = catalogue or GenreCatalogue()
+    loader = loader or Loader()
+    monkeypatch.setattr(catalogue, '_load', loader)
+    return catalogue, loader
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def shared_cache():
+    # Общий кэш воркеров: у locmem с одним LOCATION хранилище общее
+    with override_settings(
+        CACHES={'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                           'LOCATION': f'genre-catalogue-{uuid.uuid4()}'}},
+        GENRE_CACHE_ALIAS='shared',
+    ):
+        yield
+
+
+@override_settings(GENRE_CACHE_ALIAS=None)
+def test_hits_and_misses_are_counted(monkeypatch, clock):
+    catalogue, loader = make_catalogue(monkeypatch)
+
+    assert catalogue.get_name(DRAMA) == 'Drama'
+    assert catalogue.choices() == [(COMEDY, 'Comedy'), (DRAMA, 'Drama')]
+    assert catalogue.get_name(uuid.uuid4()) is None
+
+    assert loader.calls == 1
+    assert catalogue.stats() == {'hits': 2, 'misses': 1, 'size': 2}
+
+
+@override_settings(GENRE_CACHE_ALIAS=None, GENRE_CACHE_TIMEOUT=60)
+def test_local_copy_expires(monkeypatch, clock):
+    catalogue, loader = make_catalogue(monkeypatch)
+    catalogue.all()
+
+    clock.now += 59
+    catalogue.all()
+    assert loader.calls == 1
+
+    loader.genres[DRAMA] = 'Drama (renamed)'
+    clock.now += 1
+    assert catalogue.get_name(DRAMA) == 'Drama (renamed)'
+    assert loader.calls == 2
+    assert catalogue.stats()['misses'] == 2
+
+
+@override_settings(GENRE_CACHE_ALIAS=None)
+def test_invalidate_drops_local_copy(monkeypatch, clock):
+    catalogue, loader = make_catalogue(monkeypatch)
+    catalogue.all()
+
+    catalogue.invalidate()
+
+    assert catalogue.stats()['size'] == 0
+    catalogue.all()
+    assert loader.calls == 2
+
+
+def test_shared_copy_is_reused_by_other_workers(monkeypatch, shared_cache):
+    first, first_loader = make_catalogue(monkeypatch)
+    second, second_loader = make_catalogue(monkeypatch)
+
+    first.all()
+    assert second.get_name(DRAMA) == 'Drama'
+    second.all()
+
+    assert (first_loader.calls, second_loader.calls) == (1, 0)
+    assert second.stats() == {'hits': 2, 'misses': 0, 'size': 2}
+
+
+def test_invalidate_changes_version_for_other_workers(monkeypatch, shared_cache):
+    # Оба воркера читают одну базу
+    first, loader = make_catalogue(monkeypatch)
+    second, _ = make_catalogue(monkeypatch, loader=loader)
+    first.all()
+    second.all()
+    version = second._version
+
+    loader.genres[DRAMA] = 'Drama (renamed)'
+    second.invalidate()
+
+    # Новая версия в общем кэше: первый воркер перечитывает справочник
+    assert first.get_name(DRAMA) == 'Drama (renamed)'
+    assert loader.calls == 2
+    assert first._version != version
+    # а второй берёт копию, сохранённую первым
+    assert second.get_name(DRAMA) == 'Drama (renamed)'
+    assert loader.calls == 2
+    assert second._version == first._version
+
+
+@pytest.fixture
+def singleton(monkeypatch):
+    catalogue, loader = make_catalogue(monkeypatch, genre_catalogue)
+    with override_settings(GENRE_CACHE_ALIAS=None):
+        catalogue.invalidate()
+        yield catalogue, loader
+        catalogue.invalidate()
+
+
+def test_genre_change_invalidates_on_commit(monkeypatch, clock, singleton):
+    catalogue, loader = singleton
+    callbacks = []
+    monkeypatch.setattr(transaction, 'on_commit', callbacks.append)
+    catalogue.all()
+
+    post_save.send(sender=Genre, instance=Genre(name='Drama'), created=False)
+    # До коммита другие запросы видят старую копию
+    catalogue.all()
+    assert loader.calls == 1
+
+    assert callbacks == [genre_catalogue.invalidate]
+    callbacks[0]()
+    catalogue.all()
+    assert loader.calls == 2
@@ -0,0 +1,132 @@
+import io
+import json
+import re
+
+import pytest
+from django.core.management.base import CommandError
+from movies.management.commands.import_catalogue import (SOURCES, Command,
+                                                         copy_value, iter_json)
+
+ROWS = [{'id': n, 'name': 'Genre {}'.format(n), 'description': 'x' * (n % 7)} for n in range(40)]
+
+LAYOUTS = {
+    'json lines': '\n'.join(json.dumps(row) for row in ROWS) + '\n',
+    'array': json.dumps(ROWS),
+    'padded array': '  \n [ ' + ' ,\n '.join(json.dumps(row) for row in ROWS) + ' ] \n',
+}
+
+
+@pytest.mark.parametrize('layout', LAYOUTS)
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 64 * 1024])
+def test_iter_json_chunk_boundaries(layout, chunk_size):
+    assert list(iter_json(io.StringIO(LAYOUTS[layout]), chunk_size)) == ROWS
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5])
+def test_iter_json_scalar_split_by_chunk(chunk_size):
+    # Число на границе чанка не должно распасться на два
+    text = '12345\ntrue\n"abc"\nnull\n'
+    assert list(iter_json(io.StringIO(text), chunk_size)) == [12345, True, 'abc', None]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5])
+def test_iter_json_tokens_split_by_chunk(chunk_size):
+    # Оборванные на границе чанка строки, числа и экранирования дочитываются
+    text = '[-1.5e-3, "a\\u00e9 \\"b\\"", true, {"k": [null, 0.25]}, false]'
+    assert list(iter_json(io.StringIO(text), chunk_size)) == [
+        -1.5e-3, 'aé "b"', True, {'k': [None, 0.25]}, False]
+
+
+@pytest.mark.parametrize('text', ['', '  \n', '[]', ' [ ] '])
+def test_iter_json_empty(text):
+    assert list(iter_json(io.StringIO(text), 2)) == []
+
+
+@pytest.mark.parametrize('text, offset', [
+    ('{"a": 1}\n{"b": ', 15),
+    ('[{"a": 1}, {"b" 2}]', 16),
+    ('{"a": 1}\nnot json\n', 9),
+])
+def test_iter_json_malformed_reports_offset(text, offset):
+    with pytest.raises(ValueError, match=f'offset {offset}:'):
+        list(iter_json(io.StringIO(text), 4))
+
+
+class CountingReader(io.StringIO):
+
+    def __init__(self, text):
+        super().__init__(text)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.consumed += len(chunk)
+        return chunk
+
+
+@pytest.mark.parametrize('bad', ['{"b" 2}', 'not json', '{"b": "x\ty"}', '{"b": tru}'])
+def test_iter_json_malformed_does_not_read_rest(bad):
+    head = '{"a": 1}\n'
+    file = CountingReader(head + bad + '\n' + '{"c": 3}\n' * 10000)
+
+    with pytest.raises(ValueError, match='invalid JSON'):
+        list(iter_json(file, 16))
+    assert file.consumed <= len(head) + len(bad) + 16
+
+
+@pytest.mark.parametrize('value, expected', [
+    (None, r'\N'),
+    ('', ''),
+    ('plain', 'plain'),
+    ('tab\there', r'tab\there'),
+    ('line\nbreak\r\n', r'line\nbreak\r\n'),
+    ('back\\slash', r'back\\slash'),
+    ('\\N', r'\\N'),
+    (7.5, '7.5'),
+])
+def test_copy_value(value, expected):
+    assert copy_value(value) == expected
+
+
+class FakeCursor:
+
+    def __init__(self):
+        self.copied = []
+
+    def copy_expert(self, sql, file):
+        self.copied.extend(file.read().splitlines())
+
+
+def stage(path, **options):
+    command = Command(stdout=io.StringIO(), stderr=io.StringIO())
+    cursor = FakeCursor()
+    command.stage(cursor, SOURCES[0], 'import_genre', str(path),
+                  {'batch_size': 2, 'strict': False, **options})
+    return command, cursor
+
+
+def test_stage_counts_non_objects_as_invalid(tmp_path):
+    path = tmp_path / 'genres.jsonl'
+    path.write_text('{"name": "Drama"}\n[1]\n5\n{"name": "Comedy"}\n')
+
+    command, cursor = stage(path)
+
+    assert len(cursor.copied) == 2
+    assert command.stdout.getvalue().splitlines()[-1] == 'genres: 2 rows staged, 2 invalid'
+    assert f'{path}:2:' in command.stderr.getvalue()
+
+
+def test_stage_strict_stops_on_non_object(tmp_path):
+    path = tmp_path / 'genres.jsonl'
+    path.write_text('{"name": "Drama"}\n"Comedy"\n')
+
+    with pytest.raises(CommandError, match=re.escape(f'{path}:2:')):
+        stage(path, strict=True)
+
+
+def test_stage_malformed_tail_is_command_error(tmp_path):
+    path = tmp_path / 'genres.jsonl'
+    path.write_text('{"name": "Drama"}\n{"name": ')
+
+    with pytest.raises(CommandError, match=re.escape(f'{path}: invalid JSON at offset 27')):
+        stage(path)
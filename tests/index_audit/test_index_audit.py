@@ -0,0 +1,86 @@
+from django.apps import apps
+from movies.management.commands.index_audit import (ForeignKeyInfo, IndexInfo,
+                                                    find_duplicates,
+                                                    find_missing_fk_indexes,
+                                                    model_foreign_keys,
+                                                    model_indexes)
+
+
+def index(name, *columns, table='person_film_work', unique=False, primary=False,
+          constraint=None):
+    return IndexInfo(table, name, columns, unique, primary, constraint, 0, 8192)
+
+
+def names(duplicates):
+    return [(redundant.name, covering.name) for redundant, covering in duplicates]
+
+
+def test_prefix_index_is_redundant():
+    indexes = [
+        index('film_work_person_unq', 'film_work_id', 'person_id', unique=True,
+              constraint='film_work_person_unq'),
+        index('film_work_idx', 'film_work_id'),
+    ]
+    assert names(find_duplicates(indexes)) == [('film_work_idx', 'film_work_person_unq')]
+
+
+def test_same_columns_index_is_redundant_to_constraint():
+    indexes = [
+        index('film_work_person_idx', 'film_work_id', 'person_id'),
+        index('film_work_person_unq', 'film_work_id', 'person_id', unique=True,
+              constraint='film_work_person_unq'),
+    ]
+    assert names(find_duplicates(indexes)) == [('film_work_person_idx', 'film_work_person_unq')]
+
+
+def test_equal_indexes_reported_once():
+    indexes = [index('b_idx', 'person_id'), index('a_idx', 'person_id')]
+    assert names(find_duplicates(indexes)) == [('b_idx', 'a_idx')]
+
+
+def test_equal_unique_indexes_keep_constraint():
+    indexes = [
+        index('a_unq_idx', 'film_work_id', 'person_id', unique=True),
+        index('z_unq', 'film_work_id', 'person_id', unique=True, constraint='z_unq'),
+    ]
+    assert names(find_duplicates(indexes)) == [('a_unq_idx', 'z_unq')]
+
+
+def test_not_redundant():
+    indexes = [
+        index('pkey', 'id', unique=True, primary=True, constraint='pkey'),
+        # Уникальный индекс нельзя заменить более широким: ограничение другое
+        index('person_unq', 'person_id', unique=True, constraint='person_unq'),
+        index('person_role_idx', 'person_id', 'role'),
+        # Порядок столбцов важен
+        index('role_person_idx', 'role', 'person_id'),
+        # Такой же индекс в другой таблице
+        index('person_id_idx', 'id', table='genre_film_work'),
+    ]
+    assert find_duplicates(indexes) == []
+
+
+def test_missing_fk_index():
+    foreign_keys = [
+        ForeignKeyInfo('person_film_work', 'film_work', ('film_work_id',), 'film_work'),
+        ForeignKeyInfo('person_film_work', 'person', ('person_id',), 'person'),
+        ForeignKeyInfo('genre_film_work', 'genre', ('genre_id',), 'genre'),
+    ]
+    indexes = [
+        index('film_work_person_unq', 'film_work_id', 'person_id', unique=True),
+        # Внешний ключ не в начале индекса не помогает
+        index('genre_film_work_unq', 'film_work_id', 'genre_id', table='genre_film_work'),
+        # Индекс на person_id другой таблицы не считается
+        index('person_idx', 'person_id', table='person_credit'),
+    ]
+    missing = find_missing_fk_indexes(foreign_keys, indexes)
+    assert [key.name for key in missing] == ['person', 'genre']
+
+
+def test_movies_models_have_no_index_problems():
+    models = list(apps.get_app_config('movies').get_models())
+    indexes = [found for model in models for found in model_indexes(model)]
+    foreign_keys = [key for model in models for key in model_foreign_keys(model)]
+
+    assert find_duplicates(indexes) == []
+    assert find_missing_fk_indexes(foreign_keys, indexes) == []
@@ -0,0 +1,76 @@
+import base64
+import json
+import operator
+import os
+import sys
+import uuid
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../02_movies_admin'))
+from django.db.models import Q
+from movies.pagination import decode_cursor, encode_cursor, seek
+
+LOOKUPS = {'gt': operator.gt, 'gte': operator.ge, 'lt': operator.lt, 'lte': operator.le}
+
+
+def raw_cursor(item):
+    return base64.urlsafe_b64encode(json.dumps(item).encode()).decode()
+
+
+def matches(condition, row):
+    """Вычисляет Q из seek() над строкой {'title': ..., 'pk': ...}."""
+    results = []
+    for child in condition.children:
+        if isinstance(child, Q):
+            results.append(matches(child, row))
+        else:
+            lookup, value = child
+            field, name = lookup.rsplit('__', 1)
+            results.append(LOOKUPS[name](row[field], value))
+    return all(results) if condition.connector == Q.AND else any(results)
+
+
+@pytest.mark.parametrize('value', ['Star Wars', '', 'Кин-дза-дза!', 'a"b\\c'])
+def test_cursor_roundtrip(value):
+    pk = uuid.uuid4()
+    assert decode_cursor(encode_cursor(value, pk)) == (value, pk)
+
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!',
+    base64.urlsafe_b64encode(b'not json').decode(),
+    raw_cursor(None),
+    raw_cursor({'title': 't'}),
+    raw_cursor(['t']),
+    raw_cursor(['t', str(uuid.uuid4()), 'extra']),
+    raw_cursor(['t', 5]),
+    raw_cursor([5, str(uuid.uuid4())]),
+    raw_cursor([['t'], str(uuid.uuid4())]),
+    raw_cursor(['t', 'not-a-uuid']),
+])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(ValueError, match='invalid cursor'):
+        decode_cursor(cursor)
+
+
+def test_seek_has_range_bound_outside_or():
+    pk = uuid.uuid4()
+    condition = seek('title', 'm', pk)
+
+    # Граница title >= value стоит отдельно от OR — её Postgres берёт в Index Cond
+    assert condition.connector == Q.AND
+    assert ('title__gte', 'm') in condition.children
+
+
+@pytest.mark.parametrize('backwards', [False, True])
+def test_seek_matches_sort_order(backwards):
+    # Повторяющиеся названия: порядок внутри них задаёт id
+    rows = sorted(
+        ({'title': title, 'pk': uuid.uuid4()} for title in 'abbbcdd' for _ in range(2)),
+        key=lambda row: (row['title'], row['pk']),
+        reverse=backwards,
+    )
+    for position, row in enumerate(rows):
+        condition = seek('title', row['title'], row['pk'], backwards=backwards)
+        assert [other for other in rows if matches(condition, other)] == rows[position + 1:]
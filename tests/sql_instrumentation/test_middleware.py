@@ -0,0 +1,197 @@
+import asyncio
+import json
+from contextlib import contextmanager
+
+import pytest
+from config import middleware
+from config.middleware import (QueryRecorder, SQLInstrumentationMiddleware,
+                               current_recorder, record_query)
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def perf_counter(self):
+        return self.now
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        # Как настоящий курсор Django: запрос проходит через execute_wrappers
+        self.rows = record_query(self.connection.execute, sql, params, False,
+                                 {'connection': self.connection})
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    """Соединение, у которого запрос длится столько, сколько указано в durations."""
+
+    alias = 'default'
+    in_atomic_block = False
+
+    def __init__(self, clock, explain_error=False):
+        self.clock = clock
+        self.explain_error = explain_error
+        self.durations = {}
+        self.executed = []
+
+    def execute(self, sql, params, many, context):
+        self.executed.append(sql)
+        if sql.startswith('EXPLAIN'):
+            # EXPLAIN тоже идёт медленно, но в статистику попадать не должен
+            self.clock.now += 10
+            if self.explain_error:
+                raise DatabaseError('cannot explain')
+            return [('Seq Scan on film_work',)]
+        self.clock.now += self.durations.get(sql, 0.001)
+        return []
+
+    @contextmanager
+    def cursor(self):
+        yield FakeCursor(self)
+
+    def query(self, sql, seconds=0.001):
+        self.durations[sql] = seconds
+        with self.cursor() as cursor:
+            cursor.execute(sql)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(middleware, 'time', clock)
+    return clock
+
+
+@contextmanager
+def recording(recorder):
+    token = current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        current_recorder.reset(token)
+
+
+def test_recorder_keeps_top_slowest(clock):
+    connection = FakeConnection(clock)
+    with recording(QueryRecorder(slow_ms=1000, top=3, explain=False)) as recorder:
+        for number, ms in enumerate([5, 1, 9, 3, 7, 2]):
+            connection.query(f'SELECT {number}', ms / 1000)
+
+    stats = recorder.stats()
+    assert stats['queries'] == 6
+    assert stats['db_ms'] == 27
+    assert stats['slowest'] == [
+        {'duration_ms': 9, 'sql': 'SELECT 2'},
+        {'duration_ms': 7, 'sql': 'SELECT 4'},
+        {'duration_ms': 5, 'sql': 'SELECT 0'},
+    ]
+
+
+def test_slow_query_is_explained_without_recording_explain(clock, caplog):
+    connection = FakeConnection(clock)
+    recorder = QueryRecorder(slow_ms=100, top=3, explain=True)
+
+    with recording(recorder), caplog.at_level('WARNING', logger='config.middleware'):
+        connection.query('SELECT * FROM film_work', 0.25)
+
+    assert connection.executed == ['SELECT * FROM film_work', 'EXPLAIN SELECT * FROM film_work']
+    assert recorder.stats()['queries'] == 1
+    assert recorder.stats()['db_ms'] == 250
+    assert not recorder.explaining
+    [record] = caplog.records
+    assert json.loads(record.getMessage()) == {
+        'event': 'slow_query',
+        'database': 'default',
+        'duration_ms': 250,
+        'sql': 'SELECT * FROM film_work',
+        'plan': ['Seq Scan on film_work'],
+    }
+
+
+def test_explain_error_is_logged_without_plan(clock, caplog):
+    connection = FakeConnection(clock, explain_error=True)
+    recorder = QueryRecorder(slow_ms=100, top=3, explain=True)
+
+    with recording(recorder), caplog.at_level('WARNING', logger='config.middleware'):
+        connection.query('SELECT 1', 0.25)
+        connection.query('SELECT 2', 0.25)
+
+    assert not recorder.explaining
+    assert recorder.stats()['queries'] == 2
+    assert [json.loads(record.getMessage())['plan'] for record in caplog.records] == [None, None]
+
+
+def test_fast_and_non_select_queries_are_not_explained(clock):
+    connection = FakeConnection(clock)
+    with recording(QueryRecorder(slow_ms=100, top=3, explain=True)):
+        connection.query('SELECT 1', 0.05)
+        connection.query('SET search_path TO content', 0.25)
+
+    assert connection.executed == ['SELECT 1', 'SET search_path TO content']
+
+
+@override_settings(SQL_SLOW_QUERY_MS=1000, SQL_SLOWEST_QUERIES=3,
+                   SQL_EXPLAIN_SLOW_QUERIES=False)
+def test_server_timing_header(clock):
+    connection = FakeConnection(clock)
+
+    def view(request):
+        connection.query('SELECT 1', 0.012)
+        connection.query('SELECT 2', 0.0005)
+        clock.now += 0.1
+        return HttpResponse()
+
+    response = SQLInstrumentationMiddleware(view)(RequestFactory().get('/api/v1/movies/'))
+
+    assert response['Server-Timing'] == 'db;dur=12.50;desc="2 queries", app;dur=112.50'
+    assert current_recorder.get() is None
+
+
+@override_settings(SQL_SLOW_QUERY_MS=1000, SQL_SLOWEST_QUERIES=3,
+                   SQL_EXPLAIN_SLOW_QUERIES=False)
+def test_async_server_timing_header(clock):
+    connection = FakeConnection(clock)
+
+    async def view(request):
+        connection.query('SELECT 1', 0.002)
+        return HttpResponse()
+
+    response = asyncio.run(SQLInstrumentationMiddleware(view)(RequestFactory().get('/')))
+
+    assert response['Server-Timing'] == 'db;dur=2.00;desc="1 queries", app;dur=2.00'
+
+
+@override_settings(SQL_SLOW_QUERY_MS=1000, SQL_SLOWEST_QUERIES=3,
+                   SQL_EXPLAIN_SLOW_QUERIES=False)
+def test_recorder_is_reset_after_exception(clock):
+    def view(request):
+        assert isinstance(current_recorder.get(), QueryRecorder)
+        raise RuntimeError('view failed')
+
+    async def async_view(request):
+        return view(request)
+
+    with pytest.raises(RuntimeError):
+        SQLInstrumentationMiddleware(view)(RequestFactory().get('/'))
+    assert current_recorder.get() is None
+
+    # asyncio.run() работает в копии контекста, поэтому проверяем внутри той же задачи
+    async def call_async():
+        with pytest.raises(RuntimeError):
+            await SQLInstrumentationMiddleware(async_view)(RequestFactory().get('/'))
+        return current_recorder.get()
+
+    assert asyncio.run(call_async()) is None
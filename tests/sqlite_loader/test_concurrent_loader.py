@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '../../03_sqlite_to_postgres'))
+from db_tools import ConcurrentSQLiteLoader, SQLiteLoader
+
+SCHEMA = """
+CREATE TABLE film_work (id TEXT PRIMARY KEY, title TEXT, description TEXT, creation_date DATE,
+                        rating FLOAT, type TEXT);
+CREATE TABLE person (id TEXT PRIMARY KEY, full_name TEXT);
+CREATE TABLE genre (id TEXT PRIMARY KEY, name TEXT, description TEXT);
+CREATE TABLE genre_film_work (id TEXT PRIMARY KEY, film_work_id TEXT, genre_id TEXT);
+CREATE TABLE person_film_work (id TEXT PRIMARY KEY, film_work_id TEXT, person_id TEXT,
+                               role TEXT);
+"""
+
+# Больше SQLiteLoader.SIZE строк в таблице: каждая читается несколькими пачками
+FILMS = 1200
+PERSONS = 700
+GENRES = 20
+
+
+def fill(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany('INSERT INTO film_work VALUES (?, ?, ?, NULL, ?, ?)',
+                     [(f'f{n:05}', f'Film {n}', None, n % 10, 'movie') for n in range(FILMS)])
+    conn.executemany('INSERT INTO person VALUES (?, ?)',
+                     [(f'p{n:05}', f'Person {n}') for n in range(PERSONS)])
+    conn.executemany('INSERT INTO genre VALUES (?, ?, NULL)',
+                     [(f'g{n:02}', f'Genre {n}') for n in range(GENRES)])
+    conn.executemany('INSERT INTO genre_film_work VALUES (?, ?, ?)',
+                     [(f'gf{n:05}', f'f{n:05}', f'g{n % GENRES:02}') for n in range(FILMS)])
+    conn.executemany('INSERT INTO person_film_work VALUES (?, ?, ?, ?)',
+                     [(f'pf{n:05}', f'f{n % FILMS:05}', f'p{n % PERSONS:05}', 'actor')
+                      for n in range(FILMS * 2)])
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def connect(tmp_path):
+    path = str(tmp_path / 'db.sqlite')
+    fill(path)
+
+    @contextmanager
+    def connect():
+        conn = sqlite3.connect(path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    connect.path = path
+    return connect
+
+
+def read_sequentially(connect):
+    batches = []
+    with connect() as conn:
+        for load_method in SQLiteLoader(conn).get_load_methods():
+            while True:
+                data = load_method()
+                if not any(data.values()):
+                    break
+                batches.append(data)
+    return batches
+
+
+def run_with_timeout(target, timeout=10):
+    """Падает, а не зависает, если загрузчик не завершился."""
+    errors = []
+
+    def run():
+        try:
+            target()
+        except Exception as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'loader did not stop'
+    return errors
+
+
+@pytest.mark.parametrize('readers', [1, 2, 5])
+def test_batches_in_sequential_order(connect, readers):
+    expected = read_sequentially(connect)
+
+    batches = list(ConcurrentSQLiteLoader(connect, readers).get_batches())
+
+    assert [list(data) for data in batches] == [list(data) for data in expected]
+    assert batches == expected
+    assert sum(len(rows) for data in batches for rows in data.values()) == (
+        FILMS + PERSONS + GENRES + FILMS + FILMS * 2)
+
+
+def test_reader_error_is_raised_in_table_order(connect):
+    conn = sqlite3.connect(connect.path)
+    conn.execute('DROP TABLE genre')
+    conn.close()
+
+    tables = []
+
+    def consume():
+        for data in ConcurrentSQLiteLoader(connect, readers=5).get_batches():
+            tables.extend(data)
+
+    errors = run_with_timeout(consume)
+
+    assert len(errors) == 1
+    assert isinstance(errors[0], sqlite3.OperationalError)
+    assert 'genre' in str(errors[0])
+    # Таблицы до упавшей успели отдаться целиком и по порядку
+    assert tables == ['film_work'] * 3 + ['person'] * 2
+
+
+def test_consumer_error_stops_readers(connect, monkeypatch):
+    # Маленькие очереди: читатели упираются в них и должны заметить остановку
+    monkeypatch.setattr(ConcurrentSQLiteLoader, 'QUEUE_SIZE', 1)
+    monkeypatch.setattr(SQLiteLoader, 'SIZE', 10)
+    loader = ConcurrentSQLiteLoader(connect, readers=5)
+
+    def consume():
+        for _ in loader.get_batches():
+            raise RuntimeError('postgres is down')
+
+    errors = run_with_timeout(consume)
+
+    assert [str(error) for error in errors] == ['postgres is down']
+    assert loader.stopped.is_set()
+
+
+def test_closing_generator_stops_readers(connect, monkeypatch):
+    monkeypatch.setattr(ConcurrentSQLiteLoader, 'QUEUE_SIZE', 1)
+    monkeypatch.setattr(SQLiteLoader, 'SIZE', 10)
+    loader = ConcurrentSQLiteLoader(connect, readers=5)
+    batches = loader.get_batches()
+
+    first = next(batches)
+
+    assert list(first) == ['film_work']
+    assert not run_with_timeout(batches.close)
+    assert loader.stopped.is_set()